@@ -0,0 +1,59 @@
+"""add partial listing indexes and the social account lookup index
+
+Revision ID: add_listing_and_social_lookup_indexes
+Revises: backfill_user_name_parts
+Create Date: 2025-01-21 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_listing_and_social_lookup_indexes'
+down_revision = 'backfill_user_name_parts'
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns, partial-index predicate)
+INDEXES = [
+    ('idx_merchants_active_featured', 'merchants', ['is_featured'], 'is_active'),
+    ('idx_offers_merchant_active', 'offers', ['merchant_id'], 'is_active'),
+    ('idx_social_accounts_provider_pid', 'social_accounts', ['provider', 'provider_user_id'], None),
+]
+
+
+def upgrade():
+    bind = op.get_bind()
+    tables = set(inspect(bind).get_table_names())
+    indexes = [ix for ix in INDEXES if ix[1] in tables]
+
+    # Built CONCURRENTLY on PostgreSQL (outside a transaction) so merchant,
+    # offer and social-login writes aren't blocked while the indexes build
+    if bind.dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, columns, where in indexes:
+                op.create_index(
+                    name, table, columns, unique=False,
+                    postgresql_where=sa.text(where) if where else None,
+                    postgresql_concurrently=True, if_not_exists=True,
+                )
+    else:
+        for name, table, columns, where in indexes:
+            op.create_index(
+                name, table, columns, unique=False,
+                sqlite_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, _, _ in INDEXES:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        for name, table, _, _ in INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True)
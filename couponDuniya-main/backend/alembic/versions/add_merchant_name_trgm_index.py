@@ -0,0 +1,38 @@
+"""add trigram index for merchant name search
+
+Revision ID: add_merchant_name_trgm_index
+Revises: add_listing_and_social_lookup_indexes
+Create Date: 2025-01-21 11:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_merchant_name_trgm_index'
+down_revision = 'add_listing_and_social_lookup_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # list_merchants searches with lower(name) LIKE '%term%'; a leading
+    # wildcard can't use a B-tree, but a pg_trgm GIN index serves it.
+    # PostgreSQL only, so it isn't declared on the model.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_merchants_name_trgm "
+            "ON merchants USING gin (lower(name) gin_trgm_ops)"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_merchants_name_trgm")
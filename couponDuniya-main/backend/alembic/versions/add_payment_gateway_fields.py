@@ -2,7 +2,7 @@
 """add payment gateway fields
 
 Revision ID: add_payment_gateway_fields
-Revises: add_avatar_url
+Revises: payment_responses_001
 Create Date: 2025-01-06 12:00:00.000000
 
 """
@@ -12,37 +12,38 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = 'add_payment_gateway_fields'
-down_revision = 'add_avatar_url'
+down_revision = 'payment_responses_001'
 branch_labels = None
 depends_on = None
 
 
 def upgrade():
-    # Add new columns to payments table
-    op.add_column('payments', sa.Column('gateway', sa.String(length=50), nullable=True))
-    op.add_column('payments', sa.Column('gateway_order_id', sa.String(length=255), nullable=True))
-    op.add_column('payments', sa.Column('gateway_payment_id', sa.String(length=255), nullable=True))
-    op.add_column('payments', sa.Column('gateway_signature', sa.String(length=512), nullable=True))
-    op.add_column('payments', sa.Column('currency', sa.String(length=10), nullable=True))
-    op.add_column('payments', sa.Column('paid_at', sa.DateTime(), nullable=True))
-    
-    # Set default values for existing rows
-    op.execute("UPDATE payments SET gateway = 'razorpay' WHERE gateway IS NULL")
-    op.execute("UPDATE payments SET currency = 'INR' WHERE currency IS NULL")
-    
-    # Make gateway and currency non-nullable
-    op.alter_column('payments', 'gateway', nullable=False)
-    op.alter_column('payments', 'currency', nullable=False)
-    
-    # Add indexes
-    op.create_index(op.f('ix_payments_gateway_order_id'), 'payments', ['gateway_order_id'], unique=False)
+    # Add new columns to payments table in a single batch so the ALTERs are
+    # grouped (and SQLite rebuilds the table once instead of per column).
+    # gateway/currency carry a server default so existing rows are filled by
+    # the ADD COLUMN itself rather than a separate full-table UPDATE.
+    with op.batch_alter_table('payments') as batch_op:
+        batch_op.add_column(sa.Column('gateway', sa.String(length=16), nullable=False, server_default='razorpay'))
+        batch_op.add_column(sa.Column('gateway_order_id', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('gateway_payment_id', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('gateway_signature', sa.String(length=128), nullable=True))
+        batch_op.add_column(sa.Column('currency', sa.CHAR(length=3), nullable=False, server_default='INR'))
+        batch_op.add_column(sa.Column('paid_at', sa.DateTime(timezone=True), nullable=True))
+
+    # ISO 4217 codes only; the regex operator is PostgreSQL-specific
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_check_constraint('ck_payments_currency_iso', 'payments', "currency ~ '^[A-Z]{3}$'")
+
+    # ix_payments_gateway_order_id is built in add_payment_gateway_fields_index
 
 
 def downgrade():
-    op.drop_index(op.f('ix_payments_gateway_order_id'), table_name='payments')
-    op.drop_column('payments', 'paid_at')
-    op.drop_column('payments', 'currency')
-    op.drop_column('payments', 'gateway_signature')
-    op.drop_column('payments', 'gateway_payment_id')
-    op.drop_column('payments', 'gateway_order_id')
-    op.drop_column('payments', 'gateway')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_constraint('ck_payments_currency_iso', 'payments', type_='check')
+    with op.batch_alter_table('payments') as batch_op:
+        batch_op.drop_column('paid_at')
+        batch_op.drop_column('currency')
+        batch_op.drop_column('gateway_signature')
+        batch_op.drop_column('gateway_payment_id')
+        batch_op.drop_column('gateway_order_id')
+        batch_op.drop_column('gateway')
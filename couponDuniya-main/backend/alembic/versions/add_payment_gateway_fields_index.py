@@ -0,0 +1,41 @@
+
+"""add payment gateway_order_id index
+
+Revision ID: add_payment_gateway_fields_index
+Revises: add_payment_gateway_fields
+Create Date: 2025-01-06 12:05:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_payment_gateway_fields_index'
+down_revision = 'add_payment_gateway_fields'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction, so it lives in
+    # its own revision and runs in an autocommit block; writes to payments
+    # aren't blocked while the index builds.
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index(
+                op.f('ix_payments_gateway_order_id'), 'payments', ['gateway_order_id'],
+                unique=False, postgresql_concurrently=True, if_not_exists=True,
+            )
+    else:
+        op.create_index(op.f('ix_payments_gateway_order_id'), 'payments', ['gateway_order_id'], unique=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.drop_index(
+                op.f('ix_payments_gateway_order_id'), table_name='payments',
+                postgresql_concurrently=True, if_exists=True,
+            )
+    else:
+        op.drop_index(op.f('ix_payments_gateway_order_id'), table_name='payments')
@@ -0,0 +1,33 @@
+"""add refresh_tokens (user_id, is_revoked) index
+
+Revision ID: add_refresh_token_user_active_index
+Revises: 767908742ef5
+Create Date: 2025-01-20 10:00:00.000000
+
+"""
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_refresh_token_user_active_index'
+down_revision = '767908742ef5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # refresh_tokens is created from the models (create_all), so only add the
+    # index where the table exists and doesn't have it yet
+    inspector = inspect(op.get_bind())
+    if 'refresh_tokens' not in inspector.get_table_names():
+        return
+    indexes = [ix['name'] for ix in inspector.get_indexes('refresh_tokens')]
+
+    if 'idx_refresh_tokens_user_active' not in indexes:
+        # Backs revoke_user_refresh_tokens (user_id = ? AND is_revoked = false)
+        op.create_index('idx_refresh_tokens_user_active', 'refresh_tokens', ['user_id', 'is_revoked'])
+
+
+def downgrade():
+    op.drop_index('idx_refresh_tokens_user_active', table_name='refresh_tokens', if_exists=True)
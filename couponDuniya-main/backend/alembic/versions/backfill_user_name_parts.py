@@ -0,0 +1,36 @@
+"""backfill users.first_name / last_name from full_name
+
+Revision ID: backfill_user_name_parts
+Revises: users_email_lower_expression_index
+Create Date: 2025-01-20 12:00:00.000000
+
+"""
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = 'backfill_user_name_parts'
+down_revision = 'users_email_lower_expression_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if 'users' not in inspect(bind).get_table_names():
+        return
+
+    # Same split as split_full_name: first space separates first/last name
+    pos = "strpos(full_name, ' ')" if bind.dialect.name == 'postgresql' else "instr(full_name, ' ')"
+    op.execute(f"""
+        UPDATE users SET
+            first_name = substr(CASE WHEN {pos} > 0 THEN substr(full_name, 1, {pos} - 1) ELSE full_name END, 1, 100),
+            last_name = substr(CASE WHEN {pos} > 0 THEN substr(full_name, {pos} + 1) ELSE '' END, 1, 100)
+        WHERE first_name IS NULL AND last_name IS NULL AND full_name IS NOT NULL
+    """)
+
+
+def downgrade():
+    # Data-only backfill; the columns themselves predate this revision
+    pass
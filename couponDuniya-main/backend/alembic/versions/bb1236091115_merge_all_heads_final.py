@@ -5,7 +5,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = 'bb1236091115'
-down_revision = ('0359a010d225', 'add_payment_gateway_fields')
+down_revision = ('0359a010d225', 'add_payment_gateway_fields_index')
 branch_labels = None
 depends_on = None
 
@@ -0,0 +1,159 @@
+"""bring payments / payment_responses on existing databases up to the models
+
+Revision ID: converge_payment_schema
+Revises: add_merchant_name_trgm_index
+Create Date: 2025-01-22 10:00:00.000000
+
+payment_responses_001 and add_payment_gateway_fields were revised after they
+shipped (BIGINT id, JSONB + lz4, timestamptz, CHAR(3) currency, narrower
+varchars, CHECK constraints, reworked indexes). Databases that ran the original
+versions never got those changes; this revision applies them. Type, constraint
+and index steps check the live schema first and the remaining statements are
+idempotent, so databases built from the revised revisions are left as they are.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'converge_payment_schema'
+down_revision = 'add_merchant_name_trgm_index'
+branch_labels = None
+depends_on = None
+
+# (table, column, target type, USING expression or None)
+COLUMN_TYPES = [
+    ('payments', 'gateway', sa.String(16), None),
+    ('payments', 'gateway_order_id', sa.String(64), None),
+    ('payments', 'gateway_payment_id', sa.String(64), None),
+    ('payments', 'gateway_signature', sa.String(128), None),
+    ('payments', 'currency', sa.CHAR(3), None),
+    # Naive values were written as UTC
+    ('payments', 'paid_at', sa.DateTime(timezone=True), "paid_at AT TIME ZONE 'UTC'"),
+    ('payment_responses', 'id', sa.BigInteger(), None),
+    ('payment_responses', 'razorpay_order_id', sa.String(32), None),
+    ('payment_responses', 'razorpay_payment_id', sa.String(32), None),
+    ('payment_responses', 'razorpay_signature', sa.String(128), None),
+    ('payment_responses', 'razorpay_response', postgresql.JSONB(), 'razorpay_response::jsonb'),
+    ('payment_responses', 'created_at', sa.DateTime(timezone=True), "created_at AT TIME ZONE 'UTC'"),
+    ('payment_responses', 'updated_at', sa.DateTime(timezone=True), "updated_at AT TIME ZONE 'UTC'"),
+]
+
+# (name, table, condition, PostgreSQL only)
+CHECK_CONSTRAINTS = [
+    ('ck_payment_responses_payment_status', 'payment_responses',
+     "payment_status IN ('initiated', 'authorized', 'captured', 'success', 'failed', 'refunded')", False),
+    ('ck_payments_currency_iso', 'payments', "currency ~ '^[A-Z]{3}$'", True),
+]
+
+# Superseded by the PK and ix_payment_responses_payment_created
+REDUNDANT_INDEXES = ['ix_payment_responses_id', 'ix_payment_responses_payment_id']
+
+
+def _has_partial_payment_id_index(inspector, where_option):
+    """The original razorpay_payment_id index covered every row; the models declare a partial one."""
+    return any(
+        ix['name'] == 'ix_payment_responses_razorpay_payment_id'
+        and ix.get('dialect_options', {}).get(where_option) is not None
+        for ix in inspector.get_indexes('payment_responses')
+    )
+
+
+def _upgrade_postgresql(bind, inspector):
+    dialect = bind.dialect
+
+    for table, column, target, using in COLUMN_TYPES:
+        current = {c['name']: c['type'] for c in inspector.get_columns(table)}
+        if column not in current:
+            continue
+        if current[column].compile(dialect=dialect) == target.compile(dialect=dialect):
+            continue
+        # Narrowing fails loudly on over-long values rather than truncating them
+        op.alter_column(table, column, type_=target, postgresql_using=using)
+    op.execute("ALTER SEQUENCE IF EXISTS payment_responses_id_seq AS bigint")
+
+    op.alter_column('payments', 'gateway', server_default='razorpay')
+    op.alter_column('payments', 'currency', server_default='INR')
+    if dialect.server_version_info >= (14,):
+        op.execute("ALTER TABLE payment_responses ALTER COLUMN razorpay_response SET COMPRESSION lz4")
+    # payment_responses is insert-only (cart.verify_payment never updates a
+    # row), so pages reserved for HOT updates were only wasted space
+    op.execute("ALTER TABLE payment_responses RESET (fillfactor)")
+
+    # NOT VALID skips the full-table scan under the ALTER's exclusive lock;
+    # VALIDATE then checks existing rows holding only SHARE UPDATE EXCLUSIVE
+    to_validate = []
+    for name, table, condition, _ in CHECK_CONSTRAINTS:
+        existing = {ck['name'] for ck in inspector.get_check_constraints(table)}
+        if name not in existing:
+            op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} CHECK ({condition}) NOT VALID")
+            to_validate.append((name, table))
+
+    with op.get_context().autocommit_block():
+        for name, table in to_validate:
+            op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+
+        op.create_index(
+            'ix_payment_responses_payment_created', 'payment_responses', ['payment_id', 'created_at'],
+            postgresql_include=['payment_status'], postgresql_concurrently=True, if_not_exists=True,
+        )
+        if not _has_partial_payment_id_index(inspector, 'postgresql_where'):
+            op.drop_index('ix_payment_responses_razorpay_payment_id', table_name='payment_responses',
+                          postgresql_concurrently=True, if_exists=True)
+            op.create_index(
+                'ix_payment_responses_razorpay_payment_id', 'payment_responses', ['razorpay_payment_id'],
+                postgresql_where=sa.text('razorpay_payment_id IS NOT NULL'),
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+        op.create_index(
+            'ix_payment_responses_created_at_brin', 'payment_responses', ['created_at'],
+            postgresql_using='brin', postgresql_with={'pages_per_range': 32},
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        for name in REDUNDANT_INDEXES:
+            op.drop_index(name, table_name='payment_responses', postgresql_concurrently=True, if_exists=True)
+
+
+def _upgrade_other(inspector):
+    # SQLite ignores varchar lengths and time zones, so only the portable
+    # CHECK constraint and the index changes apply
+    for name, table, condition, pg_only in CHECK_CONSTRAINTS:
+        existing = {ck['name'] for ck in inspector.get_check_constraints(table)}
+        if pg_only or name in existing:
+            continue
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.create_check_constraint(name, condition)
+
+    indexes = {ix['name'] for ix in inspector.get_indexes('payment_responses')}
+    if 'ix_payment_responses_payment_created' not in indexes:
+        op.create_index('ix_payment_responses_payment_created', 'payment_responses', ['payment_id', 'created_at'])
+    if not _has_partial_payment_id_index(inspector, 'sqlite_where'):
+        op.drop_index('ix_payment_responses_razorpay_payment_id', table_name='payment_responses', if_exists=True)
+        op.create_index(
+            'ix_payment_responses_razorpay_payment_id', 'payment_responses', ['razorpay_payment_id'],
+            sqlite_where=sa.text('razorpay_payment_id IS NOT NULL'),
+        )
+    for name in REDUNDANT_INDEXES:
+        if name in indexes:
+            op.drop_index(name, table_name='payment_responses')
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = inspect(bind)
+    if not {'payments', 'payment_responses'} <= set(inspector.get_table_names()):
+        return
+
+    if bind.dialect.name == 'postgresql':
+        _upgrade_postgresql(bind, inspector)
+    else:
+        _upgrade_other(inspector)
+
+
+def downgrade():
+    # Databases built from the revised earlier revisions already had this
+    # schema before this revision ran, so there is no single prior state to
+    # restore; downgrading past it leaves the schema as it is.
+    pass
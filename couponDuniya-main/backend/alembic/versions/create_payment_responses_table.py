@@ -2,51 +2,86 @@
 """create payment_responses table
 
 Revision ID: payment_responses_001
-Revises: f4f635f290c8
+Revises: add_avatar_url
 Create Date: 2024-12-06 21:30:00.000000
 
 """
+import os
+
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy.dialects import sqlite
+from sqlalchemy.dialects import postgresql, sqlite
 
 # revision identifiers, used by Alembic.
 revision = 'payment_responses_001'
-down_revision = 'f4f635f290c8'
+down_revision = 'add_avatar_url'
 branch_labels = None
 depends_on = None
 
+# order_id is only read standalone by the ON DELETE CASCADE from orders; staging
+# can set SKIP_PAYMENT_RESPONSES_ORDER_ID_INDEX=1 to measure whether it's needed.
+# models/payment_response.py reads the same variable so create_all() matches.
+INDEX_ORDER_ID = os.getenv('SKIP_PAYMENT_RESPONSES_ORDER_ID_INDEX', '').lower() not in ('1', 'true', 'yes')
+
 
 def upgrade() -> None:
     op.create_table('payment_responses',
-        sa.Column('id', sa.Integer(), nullable=False),
+        # BIGINT so a high-volume webhook log never needs an INT -> BIGINT rewrite;
+        # SQLite only autoincrements an INTEGER PRIMARY KEY
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
         sa.Column('payment_id', sa.Integer(), nullable=False),
         sa.Column('order_id', sa.Integer(), nullable=False),
-        sa.Column('razorpay_order_id', sa.String(255), nullable=False),
-        sa.Column('razorpay_payment_id', sa.String(255), nullable=True),
-        sa.Column('razorpay_signature', sa.String(500), nullable=True),
+        sa.Column('razorpay_order_id', sa.String(32), nullable=False),
+        sa.Column('razorpay_payment_id', sa.String(32), nullable=True),
+        sa.Column('razorpay_signature', sa.String(128), nullable=True),
         sa.Column('payment_status', sa.String(50), nullable=False, server_default='initiated'),
         sa.Column('payment_method', sa.String(50), nullable=True),
-        sa.Column('razorpay_response', sa.JSON(), nullable=True),
+        sa.Column('razorpay_response', sa.JSON().with_variant(postgresql.JSONB(astext_type=sa.Text()), 'postgresql'), nullable=True),
         sa.Column('error_description', sa.Text(), nullable=True),
-        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
-        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('CURRENT_TIMESTAMP')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
         sa.PrimaryKeyConstraint('id'),
         sa.ForeignKeyConstraint(['payment_id'], ['payments.id'], ondelete='CASCADE'),
-        sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='CASCADE')
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='CASCADE'),
+        sa.CheckConstraint(
+            "payment_status IN ('initiated', 'authorized', 'captured', 'success', 'failed', 'refunded')",
+            name='ck_payment_responses_payment_status',
+        ),
+        # Indexes are declared with the table only to keep them next to their
+        # columns; create_table still issues a separate CREATE INDEX for each.
+        # The PK already indexes id; (payment_id, created_at) serves both the FK
+        # join and "latest response for a payment" lookups
+        sa.Index(
+            'ix_payment_responses_payment_created', 'payment_id', 'created_at',
+            postgresql_include=['payment_status'],
+        ),
+        *([sa.Index('ix_payment_responses_order_id', 'order_id', info={'audit': 'fk-join-needed'})]
+          if INDEX_ORDER_ID else []),
+        sa.Index('ix_payment_responses_razorpay_order_id', 'razorpay_order_id'),
+        # Rows still in 'initiated' have no razorpay_payment_id; only index the rows
+        # that can actually be looked up by it (MySQL ignores the WHERE options)
+        sa.Index(
+            'ix_payment_responses_razorpay_payment_id', 'razorpay_payment_id',
+            postgresql_where=sa.text('razorpay_payment_id IS NOT NULL'),
+            sqlite_where=sa.text('razorpay_payment_id IS NOT NULL'),
+        ),
     )
-    
-    op.create_index('ix_payment_responses_id', 'payment_responses', ['id'])
-    op.create_index('ix_payment_responses_payment_id', 'payment_responses', ['payment_id'])
-    op.create_index('ix_payment_responses_order_id', 'payment_responses', ['order_id'])
-    op.create_index('ix_payment_responses_razorpay_order_id', 'payment_responses', ['razorpay_order_id'])
-    op.create_index('ix_payment_responses_razorpay_payment_id', 'payment_responses', ['razorpay_payment_id'])
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        # Append-only, time-ordered table: a BRIN index gives cheap range scans on
+        # created_at at a fraction of a B-tree's size
+        op.create_index(
+            'ix_payment_responses_created_at_brin', 'payment_responses', ['created_at'],
+            postgresql_using='brin', postgresql_with={'pages_per_range': 32},
+        )
+        # Gateway payloads are large, repetitive JSON; lz4 (PG14+) compresses and
+        # decompresses TOASTed values much faster than the default pglz
+        if bind.dialect.server_version_info >= (14,):
+            op.execute("ALTER TABLE payment_responses ALTER COLUMN razorpay_response SET COMPRESSION lz4")
 
 
 def downgrade() -> None:
-    op.drop_index('ix_payment_responses_razorpay_payment_id', 'payment_responses')
-    op.drop_index('ix_payment_responses_razorpay_order_id', 'payment_responses')
-    op.drop_index('ix_payment_responses_order_id', 'payment_responses')
-    op.drop_index('ix_payment_responses_payment_id', 'payment_responses')
-    op.drop_index('ix_payment_responses_id', 'payment_responses')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_payment_responses_created_at_brin', 'payment_responses')
     op.drop_table('payment_responses')
@@ -5,7 +5,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = 'e645041830cf'
-down_revision = ('86f9d562e006', 'add_avatar_url')
+down_revision = '86f9d562e006'
 branch_labels = None
 depends_on = None
 
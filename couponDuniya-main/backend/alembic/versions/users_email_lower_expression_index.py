@@ -0,0 +1,49 @@
+"""make idx_users_email_lower an expression index on lower(email)
+
+Revision ID: users_email_lower_expression_index
+Revises: add_refresh_token_user_active_index
+Create Date: 2025-01-20 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = 'users_email_lower_expression_index'
+down_revision = 'add_refresh_token_user_active_index'
+branch_labels = None
+depends_on = None
+
+
+def _rebuild(columns):
+    """Replace idx_users_email_lower with an index on ``columns``."""
+    if op.get_bind().dialect.name == 'postgresql':
+        # users is the login table: build the replacement CONCURRENTLY under a
+        # temporary name, then swap, so logins never run without the index
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'idx_users_email_lower_new', 'users', columns, unique=False,
+                postgresql_concurrently=True, if_not_exists=True,
+            )
+            op.drop_index('idx_users_email_lower', table_name='users',
+                          postgresql_concurrently=True, if_exists=True)
+            op.execute("ALTER INDEX idx_users_email_lower_new RENAME TO idx_users_email_lower")
+    else:
+        op.drop_index('idx_users_email_lower', table_name='users', if_exists=True)
+        op.create_index('idx_users_email_lower', 'users', columns, unique=False)
+
+
+def upgrade():
+    inspector = inspect(op.get_bind())
+    if 'users' not in inspector.get_table_names():
+        return
+
+    # idx_users_email_lower was created on plain email, which the planner
+    # can't use for the lower(email) lookup in login
+    _rebuild([sa.text('lower(email)')])
+
+
+def downgrade():
+    _rebuild(['email'])
@@ -1381,6 +1381,7 @@ def create_banner(payload: BannerPayload, db: Session = Depends(get_db)):
 
     # Invalidate homepage cache
     cache_invalidate_prefix(rk("cache", "homepage"))
+    cache_invalidate_prefix(rk("cache", "banners"))
 
     return {
         "success": True,
@@ -1418,6 +1419,7 @@ def update_banner(id: int, payload: BannerPayload, db: Session = Depends(get_db)
 
     # Invalidate homepage cache
     cache_invalidate_prefix(rk("cache", "homepage"))
+    cache_invalidate_prefix(rk("cache", "banners"))
 
     return {
         "success": True,
@@ -1441,6 +1443,7 @@ def delete_banner(id: int, db: Session = Depends(get_db)):
 
     # Invalidate homepage cache
     cache_invalidate_prefix(rk("cache", "homepage"))
+    cache_invalidate_prefix(rk("cache", "banners"))
 
     return {
         "success": True,
@@ -1479,6 +1482,7 @@ def reorder_banner(id: int, direction: dict, db: Session = Depends(get_db)):
 
     # Invalidate homepage cache
     cache_invalidate_prefix(rk("cache", "homepage"))
+    cache_invalidate_prefix(rk("cache", "banners"))
 
     return {
         "success": True,
@@ -1,57 +1,115 @@
-from fastapi import APIRouter, HTTPException, status, Header, Depends
+from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, or_, select, update
 from pydantic import BaseModel, EmailStr, Field
-from datetime import datetime
-import httpx
+from datetime import datetime, timedelta
 import json
 import time
 import uuid
 import urllib.parse
 
 from ...security import create_access_token, get_password_hash, verify_password, revoke_token, decode_token
-from ...redis_client import rk, cache_set, cache_get, cache_invalidate, rate_limit
+from ...redis_client import rk, cache_set, cache_get, cache_invalidate, rate_limit, redis_pipeline
 from ...queue import push_email_job, push_sms_job
 from ...otp import request_otp as create_otp, verify_and_consume_otp
 from ...sms import send_otp_sms
 from ...database import get_db
 from ...models import User
+from ...models.user import split_full_name
 from ...models.social_account import SocialAccount
 from ...models.refresh_token import RefreshToken
+from ...models.referral import Referral
+from ...verification import generate_verification_token, resend_verification_throttle, verify_email_token
 from ...config import get_settings
-from ...dependencies import get_current_user
+from ...dependencies import bearer_token, get_current_user
+from ...http_client import get_http_client
+from ...responses import ORJSONResponse
 import hashlib
 import secrets
 
-router = APIRouter(prefix="/auth", tags=["Auth"])
+router = APIRouter(prefix="/auth", tags=["Auth"], default_response_class=ORJSONResponse)
 settings = get_settings()
+# Resolved once; both are read on every OAuth redirect / referral signup
+FRONTEND_URL = settings.FRONTEND_URL
+REFERRAL_BONUS_AMOUNT = getattr(settings, 'REFERRAL_BONUS_AMOUNT', 50.0)
 
 REFRESH_TOKEN_EXPIRE_DAYS = 30
 ACCESS_TOKEN_EXPIRE_SECONDS = 86400
+# Random bytes per refresh token; _hash_token relies on this being >= 48 (384 bits)
+REFRESH_TOKEN_BYTES = 64
+# Upper bound on how long a verified social token's profile is reused
+OAUTH_VERIFY_CACHE_TTL = 300
+# How long a rejected (user, password) pair short-circuits verify_password
+BAD_PASSWORD_CACHE_TTL = 60
+# Daily login counters (stats:logins:<YYYYMMDD>) are kept for a month
+LOGIN_STATS_TTL_SECONDS = 30 * 86400
 
 
 def _hash_token(token: str) -> str:
-    """Hash a token for secure storage"""
+    """Hash a token for secure storage.
+
+    Refresh tokens are REFRESH_TOKEN_BYTES of CSPRNG output, so a single unsalted
+    SHA-256 is sufficient: brute force and precomputed tables are infeasible at
+    that entropy. Don't swap in bcrypt/argon2 here - a deliberately slow hash
+    buys nothing for random tokens and runs on every login and refresh.
+    """
     return hashlib.sha256(token.encode()).hexdigest()
 
 
+def _session_key(access_token: str) -> str:
+    """Session cache key; hashed so JWTs don't end up in Redis key names."""
+    return rk("session", _hash_token(access_token))
+
+
+def _cache_session(session_key: str, user_data: dict, count_login: bool = True) -> None:
+    """Write the session payload (and the daily login counter) in one Redis round-trip."""
+    session_payload = {"user": user_data, "login_at": int(time.time())}
+    with redis_pipeline() as pipe:
+        pipe.setex(session_key, ACCESS_TOKEN_EXPIRE_SECONDS, json.dumps(session_payload))
+        if count_login:
+            logins_key = rk("stats", "logins", datetime.utcnow().strftime("%Y%m%d"))
+            pipe.incr(logins_key)
+            pipe.expire(logins_key, LOGIN_STATS_TTL_SECONDS)
+
+
+def _serialize_user(user: User) -> dict:
+    """User payload shared by the login, OTP and refresh responses and the session cache."""
+    return {
+        "id": user.id,
+        "uuid": user.uuid,
+        "email": user.email,
+        "mobile": user.mobile,
+        "full_name": user.full_name,
+        "wallet_balance": float(user.wallet_balance) if user.wallet_balance is not None else 0.0,
+        "pending_cashback": float(user.pending_cashback) if user.pending_cashback is not None else 0.0,
+        "referral_code": user.referral_code,
+        "role": user.role,
+        "is_admin": user.is_admin,
+        "is_verified": user.is_verified,
+    }
+
+
 def create_refresh_token_for_user(
     db: Session,
     user_id: int,
     ip_address: str | None = None,
     user_agent: str | None = None,
     device_info: str | None = None,
-    token_family: str | None = None
+    token_family: str | None = None,
+    commit: bool = True
 ) -> str:
-    """Create a new refresh token and store it in the database"""
-    from datetime import timedelta
+    """Create a new refresh token and store it in the database.
 
-    raw_token = secrets.token_urlsafe(64)
+    Pass commit=False to leave the insert pending in the caller's transaction.
+    """
+
+    raw_token = secrets.token_hex(REFRESH_TOKEN_BYTES)
     token_hash = _hash_token(raw_token)
 
     if not token_family:
-        token_family = str(uuid.uuid4())
+        token_family = secrets.token_hex(16)
 
     refresh_token = RefreshToken(
         user_id=user_id,
@@ -64,7 +122,8 @@ def create_refresh_token_for_user(
     )
 
     db.add(refresh_token)
-    db.commit()
+    if commit:
+        db.commit()
 
     return raw_token
 
@@ -79,41 +138,49 @@ def validate_and_rotate_refresh_token(
     Validate a refresh token, revoke it, and return a new one (rotation).
     Returns (user, new_refresh_token, error_message)
     """
-    from datetime import timedelta
 
     token_hash = _hash_token(raw_token)
 
-    stored_token = db.scalar(
-        select(RefreshToken).where(RefreshToken.token_hash == token_hash)
-    )
+    # Token and owner in one round-trip
+    row = db.execute(
+        select(RefreshToken, User)
+        .join(User, User.id == RefreshToken.user_id)
+        .where(RefreshToken.token_hash == token_hash)
+    ).one_or_none()
 
-    if not stored_token:
+    if row is None:
         return None, None, "Invalid refresh token"
+    stored_token, user = row
 
     if stored_token.is_revoked:
-        db.query(RefreshToken).filter(
-            RefreshToken.token_family == stored_token.token_family
-        ).update({"is_revoked": True, "revoked_at": datetime.utcnow(), "revoked_reason": "family_revoked"})
+        db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.token_family == stored_token.token_family)
+            .values(is_revoked=True, revoked_at=datetime.utcnow(), revoked_reason="family_revoked")
+            .execution_options(synchronize_session=False)
+        )
         db.commit()
         return None, None, "Token was already used (possible theft detected)"
 
     if stored_token.is_expired():
         return None, None, "Refresh token has expired"
 
+    if not user.is_active:
+        return None, None, "User not found or inactive"
+
     stored_token.revoke(reason="rotated")
     stored_token.last_used_at = datetime.utcnow()
 
-    user = db.query(User).filter(User.id == stored_token.user_id).first()
-    if not user or not user.is_active:
-        return None, None, "User not found or inactive"
-
+    # Revoking the old token and inserting its replacement share one commit
     new_token = create_refresh_token_for_user(
         db=db,
         user_id=user.id,
         ip_address=ip_address,
         user_agent=user_agent,
-        token_family=stored_token.token_family
+        token_family=stored_token.token_family,
+        commit=False
     )
+    db.commit()
 
     return user, new_token, None
 
@@ -180,30 +247,32 @@ class RefreshRequest(BaseModel):
 @router.post("/register", status_code=status.HTTP_201_CREATED, response_model=RegisterResponse)
 def register(payload: RegisterRequest, db: Session = Depends(get_db)):
     """Register new user with email/mobile and password."""
-    from ...verification import generate_verification_token
-    from ...email import email_service
-    from ...models.referral import Referral
 
     # Validate that at least email or mobile is provided
     if not payload.email and not payload.mobile:
         raise HTTPException(status_code=400, detail="Email or mobile is required")
 
-    # Check if user exists
-    existing_user = None
+    # Check if user exists (email or mobile) in a single query
+    conflicts = []
     if payload.email:
-        existing_user = db.query(User).filter(User.email == payload.email).first()
-    if not existing_user and payload.mobile:
-        existing_user = db.query(User).filter(User.mobile == payload.mobile).first()
+        conflicts.append(func.lower(User.email) == payload.email.lower())
+    if payload.mobile:
+        conflicts.append(User.mobile == payload.mobile)
+    existing_user_id = db.scalar(select(User.id).where(or_(*conflicts)).limit(1))
 
-    if existing_user:
+    if existing_user_id:
         raise HTTPException(status_code=400, detail="User already exists with this email or mobile")
 
     # Create new user
+    full_name = payload.full_name or "User"
+    first_name, last_name = split_full_name(full_name)
     user = User(
         email=payload.email,
         mobile=payload.mobile,
         password_hash=get_password_hash(payload.password),
-        full_name=payload.full_name or "User",
+        full_name=full_name,
+        first_name=first_name,
+        last_name=last_name,
         is_active=True,
         is_verified=False,
         role="customer",
@@ -220,19 +289,17 @@ def register(payload: RegisterRequest, db: Session = Depends(get_db)):
         if referrer and referrer.id != user.id:
             user.referred_by_id = referrer.id
 
-            referral_bonus = getattr(settings, 'REFERRAL_BONUS_AMOUNT', 50.0)
-
             referral = Referral(
                 referrer_id=referrer.id,
                 referred_id=user.id,
                 referral_code_used=payload.referral_code,
                 status="pending",
-                bonus_amount=referral_bonus,
+                bonus_amount=REFERRAL_BONUS_AMOUNT,
             )
             db.add(referral)
 
+    # Column values are already on the instance (eager_defaults, expire_on_commit=False)
     db.commit()
-    db.refresh(user)
 
     # Send verification email
     verification_token = None
@@ -241,13 +308,14 @@ def register(payload: RegisterRequest, db: Session = Depends(get_db)):
         frontend_url = settings.FRONTEND_URL or settings.FRONTEND_BASE_URL or "http://localhost:5000"
         verification_url = f"{frontend_url}/verify-email?token={verification_token}"
 
-        email_service.send_welcome_email(user.email, verification_url)
+        # Queued; the email worker does the SMTP/SendGrid round-trip
+        push_email_job("welcome", user.email, {"user_name": user.full_name, "verification_url": verification_url})
 
     return RegisterResponse(
         message="Registration successful! Please check your email to verify your account before logging in.",
         data={
             "user_id": user.id,
-            "uuid": str(user.uuid),
+            "uuid": user.uuid,
             "email": user.email,
             "mobile": user.mobile,
             "referral_code": user.referral_code,
@@ -260,7 +328,6 @@ def register(payload: RegisterRequest, db: Session = Depends(get_db)):
 @router.post("/login", response_model=dict)
 def login(payload: LoginRequest, db: Session = Depends(get_db)):
     """Login with email/mobile and password. Email must be verified first."""
-    from datetime import datetime
 
     if not payload.identifier or not payload.password:
         raise HTTPException(status_code=400, detail="Missing credentials")
@@ -269,10 +336,13 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)):
     if not allowed:
         raise HTTPException(status_code=429, detail=f"Too many attempts. Try again in {ttl}s")
 
-    # Find user by email or mobile
-    user = db.query(User).filter(
-        (User.email == payload.identifier) | (User.mobile == payload.identifier)
-    ).first()
+    # Find user by email (case-insensitive, served by idx_users_email_lower) or mobile
+    identifier = payload.identifier.strip()
+    user = db.scalar(
+        select(User).where(
+            or_(func.lower(User.email) == identifier.lower(), User.mobile == identifier)
+        )
+    )
 
     if not user:
         raise HTTPException(status_code=401, detail="Invalid email/mobile or password")
@@ -281,56 +351,52 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)):
     if not user.password_hash:
         raise HTTPException(status_code=401, detail="Password not set. Please use OTP or social login.")
 
+    # Repeats of a recently rejected password are refused without re-running the
+    # (deliberately slow) hash. The stored hash is part of the key, so a password
+    # change invalidates these entries.
+    bad_password_key = rk(
+        "badpw",
+        str(user.id),
+        hashlib.sha256(f"{user.password_hash}:{payload.password}".encode()).hexdigest()[:16],
+    )
+    if cache_get(bad_password_key):
+        raise HTTPException(status_code=401, detail="Invalid email/mobile or password")
+
     if not verify_password(payload.password, user.password_hash):
+        cache_set(bad_password_key, 1, BAD_PASSWORD_CACHE_TTL)
         raise HTTPException(status_code=401, detail="Invalid email/mobile or password")
 
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Your account has been disabled. Please contact support.")
 
     # Check email verification for email-based login - MUST verify before login
-    if user.email and user.email == payload.identifier and not user.is_verified:
+    if user.email and user.email.lower() == identifier.lower() and not user.is_verified:
         # Generate new verification token if needed
-        from ...verification import generate_verification_token
-        from ...email import email_service
-
         token = generate_verification_token(user.email)
         frontend_url = settings.FRONTEND_URL or settings.FRONTEND_BASE_URL or "http://localhost:5000"
         verification_url = f"{frontend_url}/verify-email?token={token}&email={user.email}"
 
         # Try to send email again
         if settings.EMAIL_ENABLED:
-            email_service.send_welcome_email(user.email, verification_url)
+            push_email_job("welcome", user.email, {"user_name": user.full_name, "verification_url": verification_url})
 
         raise HTTPException(
             status_code=403,
             detail=f"Please verify your email before logging in. We've sent a new verification link to {user.email}. Check your inbox."
         )
 
-    # Update last login timestamp
+    # Update last login timestamp; committed together with the new refresh token
     user.last_login_at = datetime.utcnow()
-    db.commit()
 
     # Create access token and proper refresh token
     access_token = create_access_token(str(user.id))
-    refresh_token = create_refresh_token_for_user(db=db, user_id=user.id)
-    session_key = rk("session", access_token)
+    refresh_token = create_refresh_token_for_user(db=db, user_id=user.id, commit=False)
+    db.commit()
+    session_key = _session_key(access_token)
 
-    user_data = {
-        "id": user.id,
-        "uuid": str(user.uuid),
-        "email": user.email,
-        "mobile": user.mobile,
-        "full_name": user.full_name,
-        "wallet_balance": float(user.wallet_balance or 0),
-        "pending_cashback": float(user.pending_cashback or 0),
-        "referral_code": user.referral_code,
-        "role": user.role,
-        "is_admin": user.is_admin,
-        "is_verified": user.is_verified,
-    }
+    user_data = _serialize_user(user)
 
-    session_payload = {"user": user_data, "login_at": int(time.time())}
-    cache_set(session_key, session_payload, ACCESS_TOKEN_EXPIRE_SECONDS)
+    _cache_session(session_key, user_data)
 
     return {
         "success": True,
@@ -402,36 +468,25 @@ def verify_otp_endpoint(payload: VerifyOTPRequest, db: Session = Depends(get_db)
         user = User(
             mobile=mobile,
             full_name=f"User {mobile[-4:]}",
+            first_name="User",
+            last_name=mobile[-4:],
             is_active=True,
             is_verified=True,  # Mobile verified via OTP
             referral_code=f"USER{str(uuid.uuid4())[:8].upper()}",
             role="customer", # Default role
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        # Committed together with the refresh token below
+        db.flush()
 
     # Create access token and proper refresh token
     access_token = create_access_token(str(user.id))
     refresh_token = create_refresh_token_for_user(db=db, user_id=user.id)
-    session_key = rk("session", access_token)
+    session_key = _session_key(access_token)
 
-    user_data = {
-        "id": user.id,
-        "uuid": str(user.uuid),
-        "email": user.email,
-        "mobile": user.mobile,
-        "full_name": user.full_name,
-        "wallet_balance": float(user.wallet_balance or 0),
-        "pending_cashback": float(user.pending_cashback or 0),
-        "referral_code": user.referral_code,
-        "role": user.role,
-        "is_admin": user.is_admin,
-        "is_verified": user.is_verified,
-    }
+    user_data = _serialize_user(user)
 
-    session_payload = {"user": user_data, "login_at": int(time.time())}
-    cache_set(session_key, session_payload, ACCESS_TOKEN_EXPIRE_SECONDS)
+    _cache_session(session_key, user_data)
 
     return {
         "success": True,
@@ -458,24 +513,11 @@ def refresh_token_endpoint(payload: RefreshRequest, db: Session = Depends(get_db
         raise HTTPException(status_code=401, detail=error)
 
     access_token = create_access_token(str(user.id))
-    session_key = rk("session", access_token)
+    session_key = _session_key(access_token)
 
-    user_data = {
-        "id": user.id,
-        "uuid": str(user.uuid),
-        "email": user.email,
-        "mobile": user.mobile,
-        "full_name": user.full_name,
-        "wallet_balance": float(user.wallet_balance or 0),
-        "pending_cashback": float(user.pending_cashback or 0),
-        "referral_code": user.referral_code,
-        "role": user.role,
-        "is_admin": user.is_admin,
-        "is_verified": user.is_verified,
-    }
+    user_data = _serialize_user(user)
 
-    session_payload = {"user": user_data, "login_at": int(time.time())}
-    cache_set(session_key, session_payload, ACCESS_TOKEN_EXPIRE_SECONDS)
+    _cache_session(session_key, user_data, count_login=False)
 
     return {
         "success": True,
@@ -491,13 +533,10 @@ def refresh_token_endpoint(payload: RefreshRequest, db: Session = Depends(get_db
 
 
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
-def logout(authorization: str | None = Header(None), db: Session = Depends(get_db)):
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Missing token")
-    token = authorization.split()[1]
+def logout(token: str = Depends(bearer_token), db: Session = Depends(get_db)):
 
     # Invalidate session cache
-    cache_invalidate(rk("session", token))
+    cache_invalidate(_session_key(token))
 
     # Revoke access token
     revoke_token(token)
@@ -524,11 +563,6 @@ def send_verification_email(
     db: Session = Depends(get_db)
 ):
     """Send email verification link"""
-    from ...verification import generate_verification_token, resend_verification_throttle
-    from ...email import send_welcome_email
-    from ...config import get_settings
-
-    settings = get_settings()
     email = request.email
 
     # Check throttle
@@ -547,7 +581,7 @@ def send_verification_email(
 
     # Send email
     if settings.EMAIL_ENABLED:
-        send_welcome_email(email, verification_url)
+        push_email_job("welcome", email, {"verification_url": verification_url})
     else:
         # Dev mode: log the link
         print(f"[DEV] Verification link for {email}: {verification_url}")
@@ -572,9 +606,6 @@ def verify_email(
     db: Session = Depends(get_db)
 ):
     """Verify email using token"""
-    from ...verification import verify_email_token
-    from sqlalchemy import select
-    from datetime import datetime
 
     # Verify token
     is_valid, email = verify_email_token(request.token)
@@ -586,7 +617,7 @@ def verify_email(
         )
 
     # Update user's verification status
-    user = db.scalar(select(User).where(User.email == email))
+    user = db.scalar(select(User).where(func.lower(User.email) == email.lower()))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -614,7 +645,6 @@ def check_verification_status(
     db: Session = Depends(get_db)
 ):
     """Check if an email has been verified (for cross-tab sync)"""
-    from sqlalchemy import select
 
     # Check cache first for faster response
     cached = cache_get(rk("email_verified", request.email))
@@ -629,7 +659,7 @@ def check_verification_status(
         }
 
     # Check database
-    user = db.scalar(select(User).where(User.email == request.email))
+    user = db.scalar(select(User).where(func.lower(User.email) == request.email.lower()))
     if not user:
         return {
             "success": True,
@@ -662,11 +692,11 @@ RESET_TTL_SECONDS = 1800  # 30 minutes
 
 @router.post("/password-reset/request", response_model=dict)
 def password_reset_request(payload: PasswordResetRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email).first()
+    user = db.query(User).filter(func.lower(User.email) == payload.email.lower()).first()
     if not user:
         # Do not reveal existence
         return {"success": True, "message": "If the email exists a reset link was sent."}
-    token = uuid.uuid4().hex
+    token = secrets.token_hex(16)
     cache_set(rk("pwdreset", token), {"user_id": user.id}, RESET_TTL_SECONDS)
     reset_url = f"{settings.FRONTEND_BASE_URL or 'https://app.example.com'}/reset-password?token={token}"
     if settings.EMAIL_ENABLED:
@@ -678,7 +708,7 @@ def password_reset_confirm(payload: PasswordResetConfirm, db: Session = Depends(
     data = cache_get(rk("pwdreset", payload.token))
     if not data:
         raise HTTPException(status_code=400, detail="Invalid or expired token")
-    user = db.query(User).filter(User.id == data.get("user_id")).first()
+    user = db.get(User, data["user_id"]) if data.get("user_id") else None
     if not user:
         raise HTTPException(status_code=400, detail="Invalid token context")
     user.password_hash = get_password_hash(payload.new_password)
@@ -690,21 +720,13 @@ def password_reset_confirm(payload: PasswordResetConfirm, db: Session = Depends(
 # ---------------------- Token Introspection ----------------------
 
 @router.get("/me", response_model=dict)
-def me(authorization: str | None = Header(None), db: Session = Depends(get_db)):
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Missing token")
-    token = authorization.split()[1]
+def me(token: str = Depends(bearer_token), db: Session = Depends(get_db)):
     payload = decode_token(token)
     user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == int(user_id)).first() if user_id else None
+    user = db.get(User, int(user_id)) if user_id else None
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Split full_name into first_name and last_name
-    name_parts = user.full_name.split(' ', 1) if user.full_name else ['', '']
-    first_name = name_parts[0] if len(name_parts) > 0 else ''
-    last_name = name_parts[1] if len(name_parts) > 1 else ''
-
     return {
         "success": True,
         "data": {
@@ -712,8 +734,8 @@ def me(authorization: str | None = Header(None), db: Session = Depends(get_db)):
             "email": user.email,
             "mobile": user.mobile,
             "full_name": user.full_name,
-            "first_name": first_name,
-            "last_name": last_name,
+            "first_name": user.first_name or "",
+            "last_name": user.last_name or "",
             "role": user.role,
             "is_admin": user.is_admin,
             "is_verified": user.is_verified,
@@ -729,18 +751,14 @@ class SetPasswordRequest(BaseModel):
 @router.post("/set-password", response_model=dict)
 def set_password(
     payload: SetPasswordRequest,
-    authorization: str | None = Header(None),
+    token: str = Depends(bearer_token),
     db: Session = Depends(get_db)
 ):
     """Set password for users who signed up with Google"""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Missing token")
-
-    token = authorization.split()[1]
     decoded = decode_token(token)
     user_id = decoded.get("sub")
 
-    user = db.query(User).filter(User.id == int(user_id)).first() if user_id else None
+    user = db.get(User, int(user_id)) if user_id else None
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -776,91 +794,127 @@ class SocialLinkRequest(BaseModel):
     token: str
 
 
+def _oauth_cache_ttl(expires_at) -> int:
+    """Seconds a verified token may be cached: until it expires, capped at OAUTH_VERIFY_CACHE_TTL."""
+    try:
+        expires_at = int(expires_at or 0)
+    except (TypeError, ValueError):
+        return 0
+    if not expires_at:
+        # Facebook reports 0 for tokens that don't expire
+        return OAUTH_VERIFY_CACHE_TTL
+    return min(OAUTH_VERIFY_CACHE_TTL, expires_at - int(time.time()))
+
+
 async def verify_google_token(token: str) -> dict:
     """Verify Google ID token and return user info"""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"https://oauth2.googleapis.com/tokeninfo?id_token={token}"
-        )
+    cache_key = rk("oauth", "google", _hash_token(token))
+    cached = cache_get(cache_key)
+    if isinstance(cached, dict):
+        return cached
 
-        if response.status_code != 200:
-            raise HTTPException(status_code=400, detail="Invalid Google token")
+    response = await get_http_client().get(
+        f"https://oauth2.googleapis.com/tokeninfo?id_token={token}"
+    )
 
-        data = response.json()
+    if response.status_code != 200:
+        raise HTTPException(status_code=400, detail="Invalid Google token")
 
-        return {
-            "provider_user_id": data.get("sub"),
-            "email": data.get("email"),
-            "name": data.get("name"),
-            "picture": data.get("picture"),
-            "email_verified": data.get("email_verified", False)
-        }
+    data = response.json()
+
+    user_info = {
+        "provider_user_id": data.get("sub"),
+        "email": data.get("email"),
+        "name": data.get("name"),
+        "picture": data.get("picture"),
+        "email_verified": data.get("email_verified", False)
+    }
+
+    ttl = _oauth_cache_ttl(data.get("exp"))
+    if ttl > 0:
+        cache_set(cache_key, user_info, ttl)
+    return user_info
 
 
 async def verify_facebook_token(access_token: str) -> dict:
     """Verify Facebook access token and return user info"""
-    async with httpx.AsyncClient() as client:
-        app_token = f"{settings.FACEBOOK_APP_ID}|{settings.FACEBOOK_APP_SECRET}"
-        verify_response = await client.get(
-            f"https://graph.facebook.com/debug_token",
-            params={
-                "input_token": access_token,
-                "access_token": app_token
-            }
-        )
+    cache_key = rk("oauth", "facebook", _hash_token(access_token))
+    cached = cache_get(cache_key)
+    if isinstance(cached, dict):
+        return cached
+
+    app_token = f"{settings.FACEBOOK_APP_ID}|{settings.FACEBOOK_APP_SECRET}"
+    verify_response = await get_http_client().get(
+        f"https://graph.facebook.com/debug_token",
+        params={
+            "input_token": access_token,
+            "access_token": app_token
+        }
+    )
 
-        if verify_response.status_code != 200:
-            raise HTTPException(status_code=400, detail="Invalid Facebook token")
+    if verify_response.status_code != 200:
+        raise HTTPException(status_code=400, detail="Invalid Facebook token")
 
-        verify_data = verify_response.json()
-        if not verify_data.get("data", {}).get("is_valid"):
-            raise HTTPException(status_code=400, detail="Invalid Facebook token")
+    verify_data = verify_response.json()
+    if not verify_data.get("data", {}).get("is_valid"):
+        raise HTTPException(status_code=400, detail="Invalid Facebook token")
 
-        user_response = await client.get(
-            "https://graph.facebook.com/me",
-            params={
-                "fields": "id,name,email,picture",
-                "access_token": access_token
-            }
-        )
+    user_response = await get_http_client().get(
+        "https://graph.facebook.com/me",
+        params={
+            "fields": "id,name,email,picture",
+            "access_token": access_token
+        }
+    )
 
-        if user_response.status_code != 200:
-            raise HTTPException(status_code=400, detail="Failed to fetch Facebook user info")
+    if user_response.status_code != 200:
+        raise HTTPException(status_code=400, detail="Failed to fetch Facebook user info")
 
-        data = user_response.json()
+    data = user_response.json()
 
-        return {
-            "provider_user_id": data.get("id"),
-            "email": data.get("email"),
-            "name": data.get("name"),
-            "picture": data.get("picture", {}).get("data", {}).get("url"),
-            "email_verified": True
-        }
+    user_info = {
+        "provider_user_id": data.get("id"),
+        "email": data.get("email"),
+        "name": data.get("name"),
+        "picture": data.get("picture", {}).get("data", {}).get("url"),
+        "email_verified": True
+    }
 
+    ttl = _oauth_cache_ttl(verify_data["data"].get("expires_at"))
+    if ttl > 0:
+        cache_set(cache_key, user_info, ttl)
+    return user_info
 
-@router.post("/social/google", response_model=dict)
-async def login_with_google(
-    payload: GoogleLoginRequest,
-    db: Session = Depends(get_db)
-):
-    """Login or register with Google - Auto-registers new users"""
-    user_info = await verify_google_token(payload.token)
 
-    user = db.scalar(select(User).where(User.email == user_info["email"]))
+def _profile_data_json(user_info: dict) -> str:
+    """Provider profile as stored in SocialAccount.profile_data (compact JSON)."""
+    return json.dumps(user_info, separators=(",", ":"))
+
+
+def _upsert_google_user(db: Session, user_info: dict) -> User:
+    """Find or auto-register the user for a verified Google identity and link the account.
+
+    Blocking DB work; async handlers run it via run_in_threadpool so the event
+    loop isn't held while waiting on the database.
+    """
+    profile_data = _profile_data_json(user_info)
+    user = db.scalar(
+        select(User)
+        .options(selectinload(User.social_accounts))
+        .where(func.lower(User.email) == user_info["email"].lower())
+    )
 
     if not user:
         email_verified = user_info.get("email_verified", False)
         if isinstance(email_verified, str):
             email_verified = email_verified.lower() == 'true'
 
-        full_name = user_info.get("name", "")
-        name_parts = full_name.split(' ', 1) if full_name else ['', '']
-        first_name = name_parts[0] if len(name_parts) > 0 else ''
-        last_name = name_parts[1] if len(name_parts) > 1 else ''
-
+        first_name, last_name = split_full_name(user_info.get("name"))
         user = User(
             email=user_info["email"],
-            full_name=full_name or f"{first_name} {last_name}".strip(),
+            full_name=user_info.get("name") or "",
+            first_name=first_name,
+            last_name=last_name,
             password_hash=None,
             is_verified=bool(email_verified),
             email_verified_at=datetime.utcnow() if email_verified else None,
@@ -868,42 +922,101 @@ async def login_with_google(
             is_admin=False,
             auth_provider="google",
             avatar_url=user_info.get("picture"),
+            social_accounts=[],
         )
         db.add(user)
-        db.flush()
 
-    social_account = db.scalar(
-        select(SocialAccount).where(
-            SocialAccount.provider == "google",
-            SocialAccount.provider_user_id == user_info["provider_user_id"]
-        )
+    # social_accounts is eager-loaded above and only ever holds a handful of rows
+    social_account = next(
+        (
+            account for account in user.social_accounts
+            if account.provider == "google"
+            and account.provider_user_id == user_info["provider_user_id"]
+        ),
+        None,
     )
 
     if social_account:
-        social_account.profile_data = json.dumps(user_info)
+        social_account.profile_data = profile_data
         social_account.updated_at = datetime.utcnow()
 
         if user_info.get("picture") and user.avatar_url != user_info.get("picture"):
             user.avatar_url = user_info.get("picture")
-
-        db.commit()
     else:
-        social_account = SocialAccount(
-            user_id=user.id,
+        # Appended through the relationship so a new user and its account are
+        # inserted in the same flush at commit
+        user.social_accounts.append(SocialAccount(
             provider="google",
             provider_user_id=user_info["provider_user_id"],
-            profile_data=json.dumps(user_info)
+            profile_data=profile_data
+        ))
+
+    db.commit()
+    return user
+
+
+def _upsert_facebook_user(db: Session, user_info: dict, access_token: str) -> User:
+    """Find, link or auto-register the user for a verified Facebook identity.
+
+    Blocking DB work; see _upsert_google_user.
+    """
+    profile_data = _profile_data_json(user_info)
+    linked = db.execute(
+        select(SocialAccount, User)
+        .join(User, SocialAccount.user_id == User.id)
+        .where(
+            SocialAccount.provider == "facebook",
+            SocialAccount.provider_user_id == user_info["provider_user_id"]
         )
-        db.add(social_account)
+    ).one_or_none()
+
+    if linked:
+        social_account, user = linked
+        social_account.access_token = access_token
+        social_account.profile_data = profile_data
+        social_account.updated_at = datetime.utcnow()
         db.commit()
+        return user
 
-    db.refresh(user)
+    user = db.scalar(select(User).where(func.lower(User.email) == user_info["email"].lower()))
 
-    access_token = create_access_token(str(user.id))
+    if not user:
+        first_name, last_name = split_full_name(user_info["name"])
+        user = User(
+            email=user_info["email"],
+            full_name=user_info["name"],
+            first_name=first_name,
+            last_name=last_name,
+            password_hash=None,
+            is_verified=user_info["email_verified"],
+            email_verified_at=datetime.utcnow() if user_info["email_verified"] else None,
+            auth_provider="facebook",
+            role="customer",
+        )
+        db.add(user)
+
+    db.add(SocialAccount(
+        user=user,
+        provider="facebook",
+        provider_user_id=user_info["provider_user_id"],
+        access_token=access_token,
+        profile_data=profile_data
+    ))
+
+    db.commit()
+    return user
+
+
+@router.post("/social/google", response_model=dict)
+async def login_with_google(
+    payload: GoogleLoginRequest,
+    db: Session = Depends(get_db)
+):
+    """Login or register with Google - Auto-registers new users"""
+    user_info = await verify_google_token(payload.token)
+    user = await run_in_threadpool(_upsert_google_user, db, user_info)
 
-    name_parts = (user.full_name or "").split(' ', 1)
-    first_name = name_parts[0] if len(name_parts) > 0 else ''
-    last_name = name_parts[1] if len(name_parts) > 1 else ''
+    access_token = create_access_token(str(user.id))
 
     return {
         "success": True,
@@ -913,12 +1026,12 @@ async def login_with_google(
             "token_type": "bearer",
             "user": {
                 "id": user.id,
-                "uuid": str(user.uuid),
+                "uuid": user.uuid,
                 "email": user.email,
                 "mobile": user.mobile,
                 "full_name": user.full_name,
-                "first_name": first_name,
-                "last_name": last_name,
+                "first_name": user.first_name or "",
+                "last_name": user.last_name or "",
                 "avatar_url": user.avatar_url,
                 "wallet_balance": float(user.wallet_balance or 0),
                 "pending_cashback": float(user.pending_cashback or 0),
@@ -944,56 +1057,7 @@ async def login_with_facebook(
     if not user_info.get("email"):
         raise HTTPException(status_code=400, detail="Email permission required")
 
-    social_account = db.scalar(
-        select(SocialAccount).where(
-            SocialAccount.provider == "facebook",
-            SocialAccount.provider_user_id == user_info["provider_user_id"]
-        )
-    )
-
-    if social_account:
-        user = social_account.user
-        social_account.access_token = payload.access_token
-        social_account.profile_data = json.dumps(user_info)
-        social_account.updated_at = datetime.utcnow()
-        db.commit()
-
-    else:
-        user = db.scalar(select(User).where(User.email == user_info["email"]))
-
-        if user:
-            social_account = SocialAccount(
-                user_id=user.id,
-                provider="facebook",
-                provider_user_id=user_info["provider_user_id"],
-                access_token=payload.access_token,
-                profile_data=json.dumps(user_info)
-            )
-            db.add(social_account)
-        else:
-            user = User(
-                email=user_info["email"],
-                full_name=user_info["name"],
-                password_hash=None,
-                is_verified=user_info["email_verified"],
-                email_verified_at=datetime.utcnow() if user_info["email_verified"] else None,
-                auth_provider="facebook",
-                role="customer",
-            )
-            db.add(user)
-            db.flush()
-
-            social_account = SocialAccount(
-                user_id=user.id,
-                provider="facebook",
-                provider_user_id=user_info["provider_user_id"],
-                access_token=payload.access_token,
-                profile_data=json.dumps(user_info)
-            )
-            db.add(social_account)
-
-        db.commit()
-        db.refresh(user)
+    user = await run_in_threadpool(_upsert_facebook_user, db, user_info, payload.access_token)
 
     access_token = create_access_token(str(user.id))
 
@@ -1066,20 +1130,21 @@ def unlink_social_account(
     }
 
 
+# Every parameter comes from settings (loaded once), so the URL is built at import
+_GOOGLE_CONSENT_URL = "https://accounts.google.com/o/oauth2/v2/auth?" + urllib.parse.urlencode({
+    "client_id": settings.GOOGLE_CLIENT_ID,
+    "redirect_uri": settings.GOOGLE_REDIRECT_URI,
+    "response_type": "code",
+    "scope": "openid email profile",
+    "access_type": "offline",
+    "prompt": "consent"
+})
+
+
 @router.get("/social/google/login")
 async def google_login_redirect():
     """Redirect to Google OAuth consent screen"""
-    google_auth_url = "https://accounts.google.com/o/oauth2/v2/auth"
-    params = {
-        "client_id": settings.GOOGLE_CLIENT_ID,
-        "redirect_uri": settings.GOOGLE_REDIRECT_URI,
-        "response_type": "code",
-        "scope": "openid email profile",
-        "access_type": "offline",
-        "prompt": "consent"
-    }
-    url = f"{google_auth_url}?{urllib.parse.urlencode(params)}"
-    return RedirectResponse(url=url)
+    return RedirectResponse(url=_GOOGLE_CONSENT_URL)
 
 
 @router.get("/social/google/callback")
@@ -1090,88 +1155,41 @@ async def google_callback(
 ):
     """Handle Google OAuth callback"""
     if error:
-        frontend_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:5000')
-        return RedirectResponse(url=f"{frontend_url}/login?error={error}")
+        return RedirectResponse(url=f"{FRONTEND_URL}/login?error={error}")
 
     if not code:
         raise HTTPException(status_code=400, detail="No authorization code provided")
 
     try:
-        async with httpx.AsyncClient() as client:
-            token_response = await client.post(
-                "https://oauth2.googleapis.com/token",
-                data={
-                    "code": code,
-                    "client_id": settings.GOOGLE_CLIENT_ID,
-                    "client_secret": settings.GOOGLE_CLIENT_SECRET,
-                    "redirect_uri": settings.GOOGLE_REDIRECT_URI,
-                    "grant_type": "authorization_code"
-                }
-            )
+        token_response = await get_http_client().post(
+            "https://oauth2.googleapis.com/token",
+            data={
+                "code": code,
+                "client_id": settings.GOOGLE_CLIENT_ID,
+                "client_secret": settings.GOOGLE_CLIENT_SECRET,
+                "redirect_uri": settings.GOOGLE_REDIRECT_URI,
+                "grant_type": "authorization_code"
+            }
+        )
 
-            if token_response.status_code != 200:
-                raise HTTPException(status_code=400, detail="Failed to exchange code for token")
-
-            tokens = token_response.json()
-            id_token = tokens.get("id_token")
-
-            if not id_token:
-                raise HTTPException(status_code=400, detail="No ID token in response")
-
-            user_info = await verify_google_token(id_token)
-
-            user = db.scalar(select(User).where(User.email == user_info["email"]))
-
-            if not user:
-                email_verified = user_info.get("email_verified", False)
-                if isinstance(email_verified, str):
-                    email_verified = email_verified.lower() == 'true'
-
-                user = User(
-                    email=user_info["email"],
-                    full_name=user_info.get("name", ""),
-                    password_hash=None,
-                    is_verified=bool(email_verified),
-                    email_verified_at=datetime.utcnow() if email_verified else None,
-                    role="customer",
-                    is_admin=False,
-                    auth_provider="google",
-                    avatar_url=user_info.get("picture"),
-                )
-                db.add(user)
-                db.flush()
-
-            social_account = db.scalar(
-                select(SocialAccount).where(
-                    SocialAccount.provider == "google",
-                    SocialAccount.provider_user_id == user_info["provider_user_id"]
-                )
-            )
+        if token_response.status_code != 200:
+            raise HTTPException(status_code=400, detail="Failed to exchange code for token")
 
-            if social_account:
-                social_account.profile_data = json.dumps(user_info)
-                social_account.updated_at = datetime.utcnow()
-                db.commit()
-            else:
-                social_account = SocialAccount(
-                    user_id=user.id,
-                    provider="google",
-                    provider_user_id=user_info["provider_user_id"],
-                    profile_data=json.dumps(user_info)
-                )
-                db.add(social_account)
-                db.commit()
-
-            db.refresh(user)
-            access_token = create_access_token(str(user.id))
-
-            frontend_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:5000')
-            return RedirectResponse(
-                url=f"{frontend_url}/google/callback#id_token={access_token}"
-            )
+        tokens = token_response.json()
+        id_token = tokens.get("id_token")
+
+        if not id_token:
+            raise HTTPException(status_code=400, detail="No ID token in response")
+
+        user_info = await verify_google_token(id_token)
+        user = await run_in_threadpool(_upsert_google_user, db, user_info)
+        access_token = create_access_token(str(user.id))
+
+        return RedirectResponse(
+            url=f"{FRONTEND_URL}/google/callback#id_token={access_token}"
+        )
 
     except HTTPException:
         raise
     except Exception as e:
-        frontend_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:5000')
-        return RedirectResponse(url=f"{frontend_url}/login?error=auth_failed")
\ No newline at end of file
+        return RedirectResponse(url=f"{FRONTEND_URL}/login?error=auth_failed")
\ No newline at end of file
@@ -1,8 +1,8 @@
 """Cart validation, Redis cart persistence, and checkout endpoints."""
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import Dict
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
 import hmac
 import hashlib
@@ -406,6 +406,7 @@ def checkout(
 @router.post("/verify-payment", response_model=PaymentVerificationResponse)
 def verify_payment(
     request: PaymentVerificationRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -443,7 +444,7 @@ def verify_payment(
     payment.gateway_payment_id = request.razorpay_payment_id
     payment.gateway_signature = request.razorpay_signature
     payment.status = "completed"
-    payment.paid_at = datetime.utcnow()
+    payment.paid_at = datetime.now(timezone.utc)
     
     # Store payment response
     from ...models import PaymentResponse
@@ -470,7 +471,7 @@ def verify_payment(
     db.commit()
     db.refresh(order)
     
-    # Send order confirmation email
+    # Send order confirmation email after the response goes out
     if current_user.email:
         items = db.query(OrderItem).filter(OrderItem.order_id == order.id).all()
         items_data = [{
@@ -480,7 +481,8 @@ def verify_payment(
             'subtotal': float(item.subtotal)
         } for item in items]
         
-        send_order_confirmation(
+        background_tasks.add_task(
+            send_order_confirmation,
             current_user.email,
             order.order_number,
             float(order.total_amount),
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import select
@@ -12,38 +14,63 @@ from ...dependencies import require_admin, get_current_user
 router = APIRouter(prefix="/cms", tags=["CMS"])
 
 
+BANNERS_CACHE_TTL = 300
+
+
 @router.get("/banners", response_model=List[dict])
 def get_banners(
     banner_type: str | None = None,
     limit: int = 10,
     db: Session = Depends(get_db)
 ):
-    query = db.query(Banner)
+    cache_key = rk("cache", "banners", banner_type or "all", str(limit))
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    query = select(
+        Banner.id,
+        Banner.title,
+        Banner.description,
+        Banner.image_url,
+        Banner.link_url,
+        Banner.banner_type,
+        Banner.created_at,
+        Banner.updated_at,
+    )
     if banner_type:
-        query = query.filter(Banner.type == banner_type)
-    banners = query.limit(limit).all()
-    return [
+        query = query.where(Banner.banner_type == banner_type)
+    result = [
         {
-            "id": banner.id,
-            "title": banner.title,
-            "description": banner.description,
-            "image_url": banner.image_url,
-            "call_to_action_url": banner.call_to_action_url,
-            "type": banner.type,
-            "created_at": banner.created_at,
-            "updated_at": banner.updated_at,
+            "id": row["id"],
+            "title": row["title"],
+            "description": row["description"],
+            "image_url": row["image_url"],
+            "call_to_action_url": row["link_url"],
+            "type": row["banner_type"],
+            "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+            "updated_at": row["updated_at"].isoformat() if row["updated_at"] else None,
         }
-        for banner in banners
+        for row in db.execute(query.limit(limit)).mappings()
     ]
+    cache_set(cache_key, result, BANNERS_CACHE_TTL)
+    return result
+
+
+@lru_cache(maxsize=1024)
+def _render_page_items(slug: str) -> tuple:
+    return (
+        ("slug", slug),
+        ("title", slug.replace("-", " ").title()),
+        ("content", "<p>Static page content</p>"),
+    )
+
+
+def _render_page(slug: str) -> dict:
+    # Fresh dict per call so a caller can't mutate the cached entry
+    return dict(_render_page_items(slug))
 
 
 @router.get("/pages/{slug}", response_model=dict)
 def get_page(slug: str):
-    return {
-        "success": True,
-        "data": {
-            "slug": slug,
-            "title": slug.replace("-", " ").title(),
-            "content": "<p>Static page content</p>",
-        },
-    }
\ No newline at end of file
+    return {"success": True, "data": _render_page(slug)}
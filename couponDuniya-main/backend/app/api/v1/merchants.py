@@ -1,17 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func, or_
 from typing import Optional
+from types import SimpleNamespace
 
 from ...database import get_db
 from ...models import Merchant, Offer, User
-from ...redis_client import cache_get, cache_set, cache_invalidate, cache_invalidate_prefix, rk
-from ...dependencies import rate_limit_dependency, get_current_user, require_admin
+from ...redis_client import cache_get_raw, cache_set, cache_invalidate_many, rk
+from ...dependencies import rate_limit_dependency, get_current_user_snapshot, require_admin
+from ...responses import ORJSONResponse
 from pydantic import BaseModel
 from math import ceil
-import json, hashlib
 
-router = APIRouter(prefix="/merchants", tags=["Merchants"])
+router = APIRouter(prefix="/merchants", tags=["Merchants"], default_response_class=ORJSONResponse)
 
 class MerchantFilters(BaseModel):
     page: int = 1
@@ -28,46 +29,62 @@ def list_merchants(
     is_featured: bool | None = None,
     search: str | None = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: SimpleNamespace = Depends(get_current_user_snapshot),
     _: dict = Depends(rate_limit_dependency("merchants:list", limit=100, window_seconds=60))
 ):
     """List all merchants with filtering and pagination"""
-    cache_key = rk("cache", "merchants", hashlib.md5(json.dumps({"page": page, "limit": limit, "is_featured": is_featured, "search": search}, sort_keys=True).encode()).hexdigest())
-    cached = cache_get(cache_key)
+    cache_key = rk("cache", "merchants", f"p{page}:l{limit}:f{is_featured}:s{search or ''}")
+    cached = cache_get_raw(cache_key)
     if cached:
-        return cached
+        # Stored as JSON text; hand it back without decoding and re-encoding
+        return Response(content=cached, media_type="application/json")
 
-    query = select(Merchant).where(Merchant.is_active == True)
+    # Active-offer counts come from the same statement (outer join + GROUP BY)
+    query = (
+        select(
+            Merchant.id,
+            Merchant.name,
+            Merchant.slug,
+            Merchant.logo_url,
+            Merchant.description,
+            func.count(Offer.id).label("offers_count"),
+        )
+        .outerjoin(Offer, (Offer.merchant_id == Merchant.id) & (Offer.is_active == True))
+        .where(Merchant.is_active == True)
+        .group_by(Merchant.id)
+    )
 
     if is_featured is not None:
         query = query.where(Merchant.is_featured == is_featured)
 
     if search:
-        query = query.where(Merchant.name.ilike(f"%{search}%"))
+        # Matches the lower(name) trigram index (PostgreSQL); same result as ILIKE
+        query = query.where(func.lower(Merchant.name).like(f"%{search.lower()}%"))
 
-    # Count total
-    total = db.scalar(select(func.count()).select_from(query.subquery()))
-
-    # Paginate
+    # Paginate; the window count is evaluated after GROUP BY, i.e. over merchants
     offset = (page - 1) * limit
-    query = query.offset(offset).limit(limit)
-
-    merchants = db.scalars(query).all()
-
-    merchants_data = []
-    for m in merchants:
-        offers_count = db.scalar(select(func.count(Offer.id)).where(
-            Offer.merchant_id == m.id,
-            Offer.is_active == True
-        ))
-        merchants_data.append({
+    rows = db.execute(
+        query.add_columns(func.count().over().label("total_count")).offset(offset).limit(limit)
+    ).all()
+    if rows:
+        total = rows[0].total_count
+    elif offset:
+        # Page past the end returns no rows to read the total from
+        total = db.scalar(select(func.count()).select_from(query.subquery()))
+    else:
+        total = 0
+
+    merchants_data = [
+        {
             "id": m.id,
             "name": m.name,
             "slug": m.slug,
             "logo_url": m.logo_url,
             "description": m.description,
-            "offers_count": offers_count,
-        })
+            "offers_count": m.offers_count,
+        }
+        for m in rows
+    ]
 
     response = {
         "success": True,
@@ -86,82 +103,44 @@ def list_merchants(
 
 
 @router.get("/featured")
-def featured_merchants(limit: int = 12, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def featured_merchants(limit: int = 12, db: Session = Depends(get_db), current_user: SimpleNamespace = Depends(get_current_user_snapshot)):
     """Return featured merchants. Currently approximated using newest active merchants.
     When an explicit feature flag is added, filter on that instead.
     Cached for 5 minutes.
     """
     cache_key = rk("cache","merchants","featured",str(limit))
-    cached = cache_get(cache_key)
+    cached = cache_get_raw(cache_key)
     if cached:
-        return cached
+        return Response(content=cached, media_type="application/json")
     query = (
-        select(Merchant)
+        select(Merchant.id, Merchant.name, Merchant.slug, Merchant.logo_url, Merchant.description)
         .where(Merchant.is_active == True)
         .order_by(Merchant.created_at.desc())
         .limit(limit)
     )
-    merchants = db.scalars(query).all()
-    data = [
-        {
-            "id": m.id,
-            "name": m.name,
-            "slug": m.slug,
-            "logo_url": m.logo_url,
-            "description": m.description,
-        }
-        for m in merchants
-    ]
+    data = [dict(row) for row in db.execute(query).mappings()]
     response = {"success": True, "data": data}
     cache_set(cache_key, response, 300)
     return response
 
 
-@router.get("/featured")
-def featured_merchants(limit: int = 12, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    """Return a lightweight list of featured merchants.
-
-    NOTE: The current schema does not include an explicit `is_featured` flag.
-    Until a migration adds that column, we approximate "featured" merchants by
-    selecting the most recently created active merchants (ordered by created_at desc).
-    This allows the frontend to render a featured section without schema changes.
-    """
-    query = (
-        select(Merchant)
-        .where(Merchant.is_active == True)
-        .order_by(Merchant.created_at.desc())
-        .limit(limit)
-    )
-    merchants = db.scalars(query).all()
-    data = [
-        {
-            "id": m.id,
-            "name": m.name,
-            "slug": m.slug,
-            "logo_url": m.logo_url,
-            "description": m.description,
-        }
-        for m in merchants
-    ]
-    return {"success": True, "data": data}
-
-
 @router.get("/{slug}")
-def get_merchant(slug: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_merchant(slug: str, db: Session = Depends(get_db), current_user: SimpleNamespace = Depends(get_current_user_snapshot)):
     """Get merchant by slug"""
     key = rk("cache", "merchant", slug)
-    cached = cache_get(key)
+    cached = cache_get_raw(key)
     if cached:
-        return {"success": True, "data": cached, "cache": True}
-
-    merchant = db.scalar(select(Merchant).where(Merchant.slug == slug, Merchant.is_active == True))
-    if not merchant:
+        return Response(content=f'{{"success":true,"data":{cached},"cache":true}}', media_type="application/json")
+
+    row = db.execute(
+        select(Merchant, func.count(Offer.id))
+        .outerjoin(Offer, (Offer.merchant_id == Merchant.id) & (Offer.is_active == True))
+        .where(Merchant.slug == slug, Merchant.is_active == True)
+        .group_by(Merchant.id)
+    ).first()
+    if not row:
         return {"success": False, "error": "Merchant not found"}
-
-    offers_count = db.scalar(select(func.count(Offer.id)).where(
-        Offer.merchant_id == merchant.id,
-        Offer.is_active == True
-    ))
+    merchant, offers_count = row
 
     data = {
         "id": merchant.id,
@@ -194,12 +173,9 @@ def create_merchant(
     new_merchant = Merchant(**merchant_data)
     db.add(new_merchant)
     db.commit()
-    db.refresh(new_merchant)
-
-    # Invalidate cache for merchant list and featured merchants
-    cache_invalidate_prefix(rk("cache", "merchants"))
-    cache_invalidate(rk("cache", "merchants", "featured"))
 
+    # Merchant list and featured caches both live under cache:merchants
+    cache_invalidate_many(prefixes=[rk("cache", "merchants")])
 
     return {"success": True, "data": new_merchant}
 
@@ -220,17 +196,17 @@ def update_merchant(
         if db.scalar(select(Merchant).where(Merchant.slug == merchant_data["slug"])):
             raise HTTPException(status_code=400, detail="Merchant slug already exists")
 
+    old_slug = merchant.slug
     for key, value in merchant_data.items():
         setattr(merchant, key, value)
 
     db.commit()
-    db.refresh(merchant)
-
-    # Invalidate cache
-    cache_invalidate(rk("cache", "merchant", merchant.slug))
-    cache_invalidate_prefix(rk("cache", "merchants"))
-    cache_invalidate(rk("cache", "merchants", "featured"))
 
+    # Invalidate cache (under the old slug too, if it changed)
+    cache_invalidate_many(
+        keys=[rk("cache", "merchant", old_slug), rk("cache", "merchant", merchant.slug)],
+        prefixes=[rk("cache", "merchants")],
+    )
 
     return {"success": True, "data": merchant}
 
@@ -247,12 +223,11 @@ def delete_merchant(
 
     merchant.is_active = False
     db.commit()
-    db.refresh(merchant)
 
     # Invalidate cache
-    cache_invalidate(rk("cache", "merchant", merchant.slug))
-    cache_invalidate_prefix(rk("cache", "merchants"))
-    cache_invalidate(rk("cache", "merchants", "featured"))
-
+    cache_invalidate_many(
+        keys=[rk("cache", "merchant", merchant.slug)],
+        prefixes=[rk("cache", "merchants")],
+    )
 
     return {"success": True, "message": "Merchant deleted successfully"}
\ No newline at end of file
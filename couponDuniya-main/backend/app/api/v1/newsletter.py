@@ -74,7 +74,7 @@ def subscribe_to_newsletter(
             }
 
     # Check if user exists
-    user = db.scalar(select(User).where(User.email == payload.email))
+    user = db.scalar(select(User).where(func.lower(User.email) == payload.email.lower()))
 
     # Create new subscription
     subscriber = NewsletterSubscriber(
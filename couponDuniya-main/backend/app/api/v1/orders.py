@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy.orm import Session, joinedload
 from typing import Optional, List
 from datetime import datetime
@@ -136,6 +136,7 @@ def get_order(
 def fulfill_order(
     order_id: int,
     vouchers: List[VoucherDelivery],
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -186,7 +187,7 @@ def fulfill_order(
                     item.product_name
                 )
     
-    # Send email with voucher codes
+    # Send email with voucher codes after the response goes out
     if user and user.email and fulfilled_items:
         vouchers_data = [{
             'product_name': item.product_name,
@@ -196,7 +197,8 @@ def fulfill_order(
         } for item in fulfilled_items if item.voucher_code]
         
         if vouchers_data:
-            send_voucher_email(
+            background_tasks.add_task(
+                send_voucher_email,
                 user.email,
                 order.order_number,
                 vouchers_data
@@ -1,10 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends, Request
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import func, select
 from pydantic import BaseModel
 from datetime import datetime, timedelta
-import httpx
 import json
 import urllib.parse
 
@@ -14,6 +13,7 @@ from ...models.social_account import SocialAccount
 from ...security import create_access_token, get_password_hash
 from ...config import get_settings
 from ...dependencies import get_current_user
+from ...http_client import get_http_client
 
 router = APIRouter(prefix="/auth/social", tags=["Social Authentication"])
 settings = get_settings()
@@ -34,66 +34,64 @@ class SocialLinkRequest(BaseModel):
 
 async def verify_google_token(token: str) -> dict:
     """Verify Google ID token and return user info"""
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"https://oauth2.googleapis.com/tokeninfo?id_token={token}"
-        )
+    response = await get_http_client().get(
+        f"https://oauth2.googleapis.com/tokeninfo?id_token={token}"
+    )
 
-        if response.status_code != 200:
-            raise HTTPException(status_code=400, detail="Invalid Google token")
+    if response.status_code != 200:
+        raise HTTPException(status_code=400, detail="Invalid Google token")
 
-        data = response.json()
+    data = response.json()
 
-        return {
-            "provider_user_id": data.get("sub"),
-            "email": data.get("email"),
-            "name": data.get("name"),
-            "picture": data.get("picture"),
-            "email_verified": data.get("email_verified", False)
-        }
+    return {
+        "provider_user_id": data.get("sub"),
+        "email": data.get("email"),
+        "name": data.get("name"),
+        "picture": data.get("picture"),
+        "email_verified": data.get("email_verified", False)
+    }
 
 
 async def verify_facebook_token(access_token: str) -> dict:
     """Verify Facebook access token and return user info"""
-    async with httpx.AsyncClient() as client:
-        # Verify token
-        app_token = f"{settings.FACEBOOK_APP_ID}|{settings.FACEBOOK_APP_SECRET}"
-        verify_response = await client.get(
-            f"https://graph.facebook.com/debug_token",
-            params={
-                "input_token": access_token,
-                "access_token": app_token
-            }
-        )
+    # Verify token
+    app_token = f"{settings.FACEBOOK_APP_ID}|{settings.FACEBOOK_APP_SECRET}"
+    verify_response = await get_http_client().get(
+        f"https://graph.facebook.com/debug_token",
+        params={
+            "input_token": access_token,
+            "access_token": app_token
+        }
+    )
 
-        if verify_response.status_code != 200:
-            raise HTTPException(status_code=400, detail="Invalid Facebook token")
+    if verify_response.status_code != 200:
+        raise HTTPException(status_code=400, detail="Invalid Facebook token")
 
-        verify_data = verify_response.json()
-        if not verify_data.get("data", {}).get("is_valid"):
-            raise HTTPException(status_code=400, detail="Invalid Facebook token")
+    verify_data = verify_response.json()
+    if not verify_data.get("data", {}).get("is_valid"):
+        raise HTTPException(status_code=400, detail="Invalid Facebook token")
 
-        # Get user info
-        user_response = await client.get(
-            "https://graph.facebook.com/me",
-            params={
-                "fields": "id,name,email,picture",
-                "access_token": access_token
-            }
-        )
+    # Get user info
+    user_response = await get_http_client().get(
+        "https://graph.facebook.com/me",
+        params={
+            "fields": "id,name,email,picture",
+            "access_token": access_token
+        }
+    )
 
-        if user_response.status_code != 200:
-            raise HTTPException(status_code=400, detail="Failed to fetch Facebook user info")
+    if user_response.status_code != 200:
+        raise HTTPException(status_code=400, detail="Failed to fetch Facebook user info")
 
-        data = user_response.json()
+    data = user_response.json()
 
-        return {
-            "provider_user_id": data.get("id"),
-            "email": data.get("email"),
-            "name": data.get("name"),
-            "picture": data.get("picture", {}).get("data", {}).get("url"),
-            "email_verified": True  # Facebook emails are verified
-        }
+    return {
+        "provider_user_id": data.get("id"),
+        "email": data.get("email"),
+        "name": data.get("name"),
+        "picture": data.get("picture", {}).get("data", {}).get("url"),
+        "email_verified": True  # Facebook emails are verified
+    }
 
 
 @router.post("/google", response_model=dict)
@@ -106,7 +104,7 @@ async def login_with_google(
     user_info = await verify_google_token(payload.token)
 
     # Check if user with this email exists in the database
-    user = db.scalar(select(User).where(User.email == user_info["email"]))
+    user = db.scalar(select(User).where(func.lower(User.email) == user_info["email"].lower()))
 
     if not user:
         # Auto-register new user with Google account
@@ -164,8 +162,6 @@ async def login_with_google(
         db.add(social_account)
         db.commit()
 
-    db.refresh(user)
-
     # Generate access token
     access_token = create_access_token(str(user.id))
 
@@ -235,7 +231,7 @@ async def login_with_facebook(
 
     else:
         # Check if user with this email exists
-        user = db.scalar(select(User).where(User.email == user_info["email"]))
+        user = db.scalar(select(User).where(func.lower(User.email) == user_info["email"].lower()))
 
         if user:
             # Link existing account
@@ -272,7 +268,6 @@ async def login_with_facebook(
             db.add(social_account)
 
         db.commit()
-        db.refresh(user)
 
     # Generate access token
     access_token = create_access_token(str(user.id))
@@ -377,80 +372,78 @@ async def google_callback(
         raise HTTPException(status_code=400, detail="No authorization code provided")
 
     try:
-        async with httpx.AsyncClient() as client:
-            token_response = await client.post(
-                "https://oauth2.googleapis.com/token",
-                data={
-                    "code": code,
-                    "client_id": settings.GOOGLE_CLIENT_ID,
-                    "client_secret": settings.GOOGLE_CLIENT_SECRET,
-                    "redirect_uri": settings.GOOGLE_REDIRECT_URI,
-                    "grant_type": "authorization_code"
-                }
-            )
+        token_response = await get_http_client().post(
+            "https://oauth2.googleapis.com/token",
+            data={
+                "code": code,
+                "client_id": settings.GOOGLE_CLIENT_ID,
+                "client_secret": settings.GOOGLE_CLIENT_SECRET,
+                "redirect_uri": settings.GOOGLE_REDIRECT_URI,
+                "grant_type": "authorization_code"
+            }
+        )
 
-            if token_response.status_code != 200:
-                raise HTTPException(status_code=400, detail="Failed to exchange code for token")
+        if token_response.status_code != 200:
+            raise HTTPException(status_code=400, detail="Failed to exchange code for token")
 
-            tokens = token_response.json()
-            id_token = tokens.get("id_token")
+        tokens = token_response.json()
+        id_token = tokens.get("id_token")
 
-            if not id_token:
-                raise HTTPException(status_code=400, detail="No ID token in response")
+        if not id_token:
+            raise HTTPException(status_code=400, detail="No ID token in response")
 
-            user_info = await verify_google_token(id_token)
+        user_info = await verify_google_token(id_token)
 
-            user = db.scalar(select(User).where(User.email == user_info["email"]))
+        user = db.scalar(select(User).where(func.lower(User.email) == user_info["email"].lower()))
 
-            if not user:
-                # Auto-register new user with Google account
-                email_verified = user_info.get("email_verified", False)
-                # Convert string 'true'/'false' to boolean if needed
-                if isinstance(email_verified, str):
-                    email_verified = email_verified.lower() == 'true'
+        if not user:
+            # Auto-register new user with Google account
+            email_verified = user_info.get("email_verified", False)
+            # Convert string 'true'/'false' to boolean if needed
+            if isinstance(email_verified, str):
+                email_verified = email_verified.lower() == 'true'
                 
-                user = User(
-                    email=user_info["email"],
-                    full_name=user_info.get("name", ""),
-                    password_hash=None,  # No password for social login - prevents password auth
-                    is_verified=bool(email_verified),
-                    email_verified_at=datetime.utcnow() if email_verified else None,
-                    role="customer",
-                    is_admin=False,
-                    auth_provider="google",
-                    avatar_url=user_info.get("picture"),  # Store Google profile picture
-                )
-                db.add(user)
-                db.flush()
-
-            social_account = db.scalar(
-                select(SocialAccount).where(
-                    SocialAccount.provider == "google",
-                    SocialAccount.provider_user_id == user_info["provider_user_id"]
-                )
+            user = User(
+                email=user_info["email"],
+                full_name=user_info.get("name", ""),
+                password_hash=None,  # No password for social login - prevents password auth
+                is_verified=bool(email_verified),
+                email_verified_at=datetime.utcnow() if email_verified else None,
+                role="customer",
+                is_admin=False,
+                auth_provider="google",
+                avatar_url=user_info.get("picture"),  # Store Google profile picture
             )
+            db.add(user)
+            db.flush()
+
+        social_account = db.scalar(
+            select(SocialAccount).where(
+                SocialAccount.provider == "google",
+                SocialAccount.provider_user_id == user_info["provider_user_id"]
+            )
+        )
 
-            if social_account:
-                social_account.profile_data = json.dumps(user_info)
-                social_account.updated_at = datetime.utcnow()
-                db.commit()
-            else:
-                social_account = SocialAccount(
-                    user_id=user.id,
-                    provider="google",
-                    provider_user_id=user_info["provider_user_id"],
-                    profile_data=json.dumps(user_info)
-                )
-                db.add(social_account)
-                db.commit()
-
-            db.refresh(user)
-            access_token = create_access_token(str(user.id))
-
-            frontend_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:5000')
-            return RedirectResponse(
-                url=f"{frontend_url}/google/callback#id_token={access_token}"
+        if social_account:
+            social_account.profile_data = json.dumps(user_info)
+            social_account.updated_at = datetime.utcnow()
+            db.commit()
+        else:
+            social_account = SocialAccount(
+                user_id=user.id,
+                provider="google",
+                provider_user_id=user_info["provider_user_id"],
+                profile_data=json.dumps(user_info)
             )
+            db.add(social_account)
+            db.commit()
+
+        access_token = create_access_token(str(user.id))
+
+        frontend_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:5000')
+        return RedirectResponse(
+            url=f"{frontend_url}/google/callback#id_token={access_token}"
+        )
 
     except HTTPException:
         raise
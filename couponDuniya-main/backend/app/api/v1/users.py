@@ -1,12 +1,15 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
 
 from ...database import get_db
 from ...models import User
-from ...dependencies import get_current_user
+from ...models.user import split_full_name
+from ...dependencies import get_current_user, invalidate_user_snapshot
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -36,20 +39,23 @@ class KYCUpdateRequest(BaseModel):
 @router.get("/me", response_model=dict)
 def get_current_user_profile(current_user: User = Depends(get_current_user)):
     """Get current user profile - Protected route"""
-    name_parts = (current_user.full_name or "").split(' ', 1)
-    first_name = name_parts[0] if len(name_parts) > 0 else ''
-    last_name = name_parts[1] if len(name_parts) > 1 else ''
-    
+    first_name, last_name = current_user.first_name, current_user.last_name
+    # first/last_name are stored on write; only legacy rows need the full_name split
+    if not (first_name and last_name):
+        fallback_first, fallback_last = split_full_name(current_user.full_name)
+        first_name = first_name or fallback_first
+        last_name = last_name or fallback_last
+
     return {
         "success": True,
         "data": {
             "id": current_user.id,
-            "uuid": str(current_user.uuid),
+            "uuid": current_user.uuid,
             "email": current_user.email,
             "mobile": current_user.mobile,
             "full_name": current_user.full_name,
-            "first_name": current_user.first_name or first_name,
-            "last_name": current_user.last_name or last_name,
+            "first_name": first_name,
+            "last_name": last_name,
             "avatar_url": current_user.avatar_url,
             "date_of_birth": current_user.date_of_birth,
             "gender": current_user.gender,
@@ -73,46 +79,40 @@ def update_profile(
 ):
     """Update user profile - Protected route"""
     try:
-        # Update fields if provided
-        if payload.first_name is not None:
-            current_user.first_name = payload.first_name
-        
-        if payload.last_name is not None:
-            current_user.last_name = payload.last_name
-        
-        if payload.full_name is not None:
-            current_user.full_name = payload.full_name
-        elif payload.first_name or payload.last_name:
+        # Only the fields that were sent; written with a single UPDATE
+        values = payload.model_dump(exclude_none=True)
+
+        if "full_name" in values:
+            # Keep the stored name parts in step unless they were sent explicitly
+            if "first_name" not in values and "last_name" not in values:
+                values["first_name"], values["last_name"] = split_full_name(values["full_name"])
+        elif values.get("first_name") or values.get("last_name"):
             # Auto-update full_name from first_name and last_name
-            first = payload.first_name or current_user.first_name or ""
-            last = payload.last_name or current_user.last_name or ""
-            current_user.full_name = f"{first} {last}".strip()
-        
-        if payload.mobile is not None:
-            # Check if mobile is already taken by another user
-            existing = db.query(User).filter(
-                User.mobile == payload.mobile,
-                User.id != current_user.id
-            ).first()
-            if existing:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Mobile number already in use"
-                )
-            current_user.mobile = payload.mobile
-        
-        if payload.date_of_birth is not None:
-            current_user.date_of_birth = payload.date_of_birth
-        
-        if payload.gender is not None:
-            current_user.gender = payload.gender
-        
-        if payload.avatar_url is not None:
-            current_user.avatar_url = payload.avatar_url
-        
-        current_user.updated_at = datetime.utcnow()
+            first = values.get("first_name") or current_user.first_name or ""
+            last = values.get("last_name") or current_user.last_name or ""
+            values["full_name"] = f"{first} {last}".strip()
+
+        values["updated_at"] = datetime.utcnow()
+        stmt = update(User).where(User.id == current_user.id)
+
+        if "mobile" in values:
+            # Checked in the UPDATE itself rather than a separate SELECT. Two
+            # concurrent claims can both pass this guard; the unique
+            # constraint on users.mobile catches the loser (IntegrityError below)
+            other = aliased(User)
+            stmt = stmt.where(
+                ~exists().where(other.mobile == payload.mobile, other.id != current_user.id)
+            )
+
+        # ORM-enabled UPDATE also syncs the new values onto current_user
+        result = db.execute(stmt.values(**values))
+        if result.rowcount == 0:
+            raise HTTPException(
+                status_code=400,
+                detail="Mobile number already in use"
+            )
         db.commit()
-        db.refresh(current_user)
+        invalidate_user_snapshot(current_user.id)
         
         return {
             "success": True,
@@ -131,6 +131,12 @@ def update_profile(
     
     except HTTPException:
         raise
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Mobile number already in use"
+        )
     except Exception as e:
         db.rollback()
         raise HTTPException(
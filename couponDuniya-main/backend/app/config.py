@@ -1,12 +1,20 @@
 import os
 from pydantic_settings import BaseSettings
-from functools import lru_cache
 
 class Settings(BaseSettings):
     APP_NAME: str = "CouponAli API"
     APP_ENV: str = "development"
     DEBUG: bool = True
     DATABASE_URL: str = os.getenv("DATABASE_URL", "postgresql+psycopg://localhost:5432/couponali")
+    # Sync routes run in the threadpool, one DB connection each; keep
+    # pool + overflow >= THREADPOOL_SIZE so threads don't queue on the pool
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 30
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    # Set when connecting through PgBouncer (transaction pooling); disables the app-side pool
+    DATABASE_NULL_POOL: bool = False
+    THREADPOOL_SIZE: int = 40
     REDIS_URL: str = "redis://localhost:6379"
     SECRET_KEY: str = os.getenv("SECRET_KEY", "dev-secret-change-in-production")
     JWT_ALGORITHM: str = "HS256"
@@ -43,7 +51,9 @@ class Settings(BaseSettings):
     SMTP_PORT: int = 587
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
+    SMTP_IMPLICIT_TLS: bool = False  # SMTPS; also implied by SMTP_PORT=465
     EMAIL_FROM: str = "noreply@couponali.com"
+    EMAIL_FROM_NAME: str = ""  # Display name for the From header; address only when empty
     # Optional SendGrid API key. If provided, SendGrid is preferred over SMTP.
     SENDGRID_API_KEY: str = ""
     
@@ -65,7 +75,14 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
         extra = "ignore"  # Ignore extra fields in .env file
+        # Loaded once and shared; modules cache values derived from it at import
+        frozen = True
+
+_SETTINGS: Settings | None = None
 
-@lru_cache()
 def get_settings() -> Settings:
-    return Settings()
+    global _SETTINGS
+    settings = _SETTINGS
+    if settings is None:
+        settings = _SETTINGS = Settings()
+    return settings
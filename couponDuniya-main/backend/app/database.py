@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from .config import get_settings
 
@@ -17,8 +18,21 @@ if database_url.startswith("sqlite"):
         echo=settings.DEBUG, 
         connect_args={"check_same_thread": False}
     )
+elif settings.DATABASE_NULL_POOL:
+    engine = create_engine(
+        database_url,
+        echo=settings.DEBUG,
+        poolclass=NullPool,
+    )
 else:
-    engine = create_engine(database_url, echo=settings.DEBUG, pool_pre_ping=True)
+    engine = create_engine(
+        database_url,
+        echo=settings.DEBUG,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    )
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
 
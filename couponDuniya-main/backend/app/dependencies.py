@@ -1,13 +1,13 @@
 from fastapi import Depends, HTTPException, Header, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from sqlalchemy import select
 from jose import jwt, JWTError
 from .config import get_settings
 from .database import get_db
-from .redis_client import rk, cache_get, rate_limit
+from .redis_client import rk, cache_get, cache_set, cache_invalidate, rate_limit
 from .models import User
 from .security import decode_token
+from types import SimpleNamespace
 import os
 
 settings = get_settings()
@@ -33,7 +33,7 @@ def get_current_user(
             )
         
         # Get user from database
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        user = db.get(User, int(user_id))
         
         if not user:
             raise HTTPException(
@@ -90,12 +90,50 @@ def get_current_user(db: Session = Depends(get_db), authorization: str | None =
     except JWTError as e:
         raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
 
-    user = db.scalar(select(User).where(User.id == user_id))
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
     return user
 
+def bearer_token(authorization: str | None = Header(None)) -> str:
+    """Return the raw token from an `Authorization: Bearer <token>` header."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Missing token")
+    return token
+
+USER_SNAPSHOT_TTL = 30
+_USER_SNAPSHOT_FIELDS = ("id", "email", "full_name", "role", "is_admin", "is_active")
+
+def _user_snapshot_key(user_id: int) -> str:
+    return rk("user", "snapshot", str(user_id))
+
+def get_current_user_snapshot(token: str = Depends(bearer_token), db: Session = Depends(get_db)) -> SimpleNamespace:
+    """Authenticated user as a read-only snapshot, cached in Redis for USER_SNAPSHOT_TTL.
+
+    For endpoints that only need to know who is calling: skips the users SELECT on
+    cache hits. Anything that modifies the user must keep using get_current_user.
+    """
+    payload = decode_token(token)
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=401, detail="Invalid user ID in token")
+
+    key = _user_snapshot_key(user_id)
+    data = cache_get(key)
+    if not isinstance(data, dict):
+        user = db.get(User, user_id)
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+        data = {field: getattr(user, field) for field in _USER_SNAPSHOT_FIELDS}
+        cache_set(key, data, USER_SNAPSHOT_TTL)
+    return SimpleNamespace(**data)
+
+def invalidate_user_snapshot(user_id: int) -> None:
+    cache_invalidate(_user_snapshot_key(user_id))
+
 def get_current_admin_user(current_user: User = Depends(get_current_user)):
     """Verify user has admin role"""
     if current_user.role != "admin" and not current_user.is_admin:
@@ -106,21 +144,30 @@ def get_current_admin_user(current_user: User = Depends(get_current_user)):
 get_current_admin = get_current_admin_user
 require_admin = get_current_admin_user
 
+def _build_admin_ip_allowlist() -> frozenset[str]:
+    """Parse ADMIN_IP_WHITELIST (CSV string or list) once; empty means no restriction."""
+    whitelist = getattr(settings, "ADMIN_IP_WHITELIST", "") or ""
+    if isinstance(whitelist, str):
+        whitelist = whitelist.split(',')
+    allowed = {ip.strip() for ip in whitelist if ip.strip()}
+    if not allowed:
+        return frozenset()
+    return frozenset(allowed | {"127.0.0.1", "::1", "0.0.0.0"})
+
+
+_ADMIN_IP_ALLOWLIST = _build_admin_ip_allowlist()
+
 def verify_admin_ip(request: Request):
     """Verify admin IP - disabled in development"""
     # Skip IP check in development
     if os.getenv("ENVIRONMENT", "development") == "development":
         return True
 
-    whitelist = getattr(settings, "ADMIN_IP_WHITELIST", "") or ""
-    if not whitelist:
+    if not _ADMIN_IP_ALLOWLIST:
         return True
 
-    allowed = {ip.strip() for ip in whitelist.split(',') if ip.strip()}
-    allowed.update({"127.0.0.1", "::1", "0.0.0.0"})
-
     client_ip = request.client.host if request.client else None
-    if client_ip not in allowed:
+    if client_ip not in _ADMIN_IP_ALLOWLIST:
         raise HTTPException(status_code=403, detail="Admin access forbidden from this IP")
     return True
 
@@ -10,28 +10,195 @@ will only log the email and return success so the rest of the application
 can proceed.
 """
 import logging
+import queue
 import smtplib
+import ssl
+from html import escape as _esc
 from typing import Optional, Tuple
 from email.message import EmailMessage
+from email.utils import formataddr
+import orjson
 from .config import get_settings
-import json
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+except ImportError:  # pragma: no cover - SendGrid unavailable, SMTP still works
+    requests = None
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Authenticated SMTP connections kept open between sends
+SMTP_POOL_SIZE = 4
+
+# Built once: creating a context loads the CA bundle
+_SMTP_SSL_CONTEXT = ssl.create_default_context()
+
+# One keep-alive session for every SendGrid call, so sends after the first
+# skip the TCP/TLS handshake. Only 429/503 are retried: SendGrid didn't
+# accept the message, so a retry can't send it twice.
+_SENDGRID_SESSION = None
+if requests is not None:
+    _SENDGRID_SESSION = requests.Session()
+    _SENDGRID_SESSION.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=(429, 503),
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False,
+        ),
+    ))
+
+
+# HTML bodies, formatted with str.format. Kept at module level so each send
+# only fills in its values; user/catalog text is passed through _esc first.
+_WELCOME_VERIFY_SECTION = """
+            <div style="background-color: #f0f8ff; padding: 20px; margin: 20px 0; border-radius: 5px;">
+                <h2>Verify Your Email</h2>
+                <p>Please click the button below to verify your email address:</p>
+                <a href="{verification_url}" style="display: inline-block; padding: 12px 24px; background-color: #007bff; color: white; text-decoration: none; border-radius: 5px; margin: 10px 0;">Verify Email</a>
+                <p style="color: #666; font-size: 12px;">Or copy and paste this link: {verification_url}</p>
+                <p style="color: #666; font-size: 12px;">This link will expire in 24 hours.</p>
+            </div>
+            """
+
+_WELCOME_TEMPLATE = """
+        <html>
+            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                    <h1 style="color: #007bff;">Welcome to CouponAli!</h1>
+                    <p>Thank you for joining us. Start saving on gift cards and earning cashback today!</p>
+                    {verify_section}
+                    <h3>What's Next?</h3>
+                    <ul>
+                        <li>Browse thousands of gift cards</li>
+                        <li>Earn cashback on every purchase</li>
+                        <li>Track your orders and wallet</li>
+                        <li>Refer friends and earn rewards</li>
+                    </ul>
+                    <p>Best regards,<br><strong>CouponAli Team</strong></p>
+                </div>
+            </body>
+        </html>
+        """
+
+_ORDER_ITEM_ROW_TEMPLATE = """
+            <tr>
+                <td>{product_name}</td>
+                <td>{quantity}</td>
+                <td>₹{unit_price:.2f}</td>
+                <td>₹{subtotal:.2f}</td>
+            </tr>
+            """
+
+_ORDER_TEMPLATE = """
+        <html>
+            <body>
+                <h1>Order Confirmed!</h1>
+                <p>Your order <strong>{order_number}</strong> has been confirmed.</p>
+
+                <h2>Order Details</h2>
+                <table border="1" cellpadding="10">
+                    <tr>
+                        <th>Product</th>
+                        <th>Quantity</th>
+                        <th>Unit Price</th>
+                        <th>Subtotal</th>
+                    </tr>
+                    {items_html}
+                </table>
+
+                <h3>Total: ₹{total_amount:.2f}</h3>
+
+                <p>You will receive your voucher codes shortly.</p>
+
+                <p>Best regards,<br>CouponAli Team</p>
+            </body>
+        </html>
+        """
+
+_VOUCHER_ROW_TEMPLATE = """
+            <div style="margin: 20px 0; padding: 15px; border: 2px solid #4CAF50; border-radius: 5px;">
+                <h3>{product_name}</h3>
+                <p><strong>Voucher Code:</strong> <span style="font-size: 20px; color: #4CAF50;">{code}</span></p>
+                <p><strong>Value:</strong> ₹{value:.2f}</p>
+                {instructions_html}
+            </div>
+            """
+
+_VOUCHER_TEMPLATE = """
+        <html>
+            <body>
+                <h1>Your Voucher Codes Are Ready!</h1>
+                <p>Order: <strong>{order_number}</strong></p>
+
+                {vouchers_html}
+
+                <p><strong>Important:</strong> Keep these codes safe and do not share them with anyone.</p>
+
+                <p>Best regards,<br>CouponAli Team</p>
+            </body>
+        </html>
+        """
+
+_CASHBACK_TEMPLATE = """
+        <html>
+            <body>
+                <h1>Cashback Credited!</h1>
+                <p>₹{amount:.2f} has been credited to your CouponAli wallet.</p>
+                <p>{description}</p>
+                <p>Best regards,<br>CouponAli Team</p>
+            </body>
+        </html>
+        """
+
+_WITHDRAWAL_TEMPLATE = """
+        <html>
+            <body>
+                <h1>Withdrawal Update</h1>
+                <p>{message}</p>
+                <p>Best regards,<br>CouponAli Team</p>
+            </body>
+        </html>
+        """
+
 
 class EmailService:
     """Email service using SMTP or SendGrid API (if configured)."""
 
     def __init__(self):
         # Read values from settings at init so changes to env require a restart
-        self.enabled: bool = bool(getattr(settings, "EMAIL_ENABLED", False))
-        self.from_email: str = getattr(settings, "EMAIL_FROM", "noreply@couponali.com")
-        self.smtp_host: str = getattr(settings, "SMTP_HOST", "")
-        self.smtp_port: int = int(getattr(settings, "SMTP_PORT", 0) or 0)
-        self.smtp_user: str = getattr(settings, "SMTP_USER", "")
-        self.smtp_password: str = getattr(settings, "SMTP_PASSWORD", "")
-        self.sendgrid_api_key: str = getattr(settings, "SENDGRID_API_KEY", "")
+        self.enabled: bool = settings.EMAIL_ENABLED
+        self.from_email: str = settings.EMAIL_FROM
+        self.smtp_host: str = settings.SMTP_HOST
+        self.smtp_port: int = settings.SMTP_PORT
+        self.smtp_user: str = settings.SMTP_USER
+        self.smtp_password: str = settings.SMTP_PASSWORD
+        # Port 465 is implicit TLS (SMTPS): no STARTTLS round-trip
+        self.smtp_implicit_tls: bool = settings.SMTP_IMPLICIT_TLS or self.smtp_port == 465
+        self.sendgrid_api_key: str = settings.SENDGRID_API_KEY
+        self.from_name: str = settings.EMAIL_FROM_NAME
+        # Sender identity is fixed for the process; format it once
+        self._from_header: str = formataddr((self.from_name, self.from_email))
+        self._sendgrid_from: dict = {"email": self.from_email}
+        if self.from_name:
+            self._sendgrid_from["name"] = self.from_name
+        self._sendgrid_headers: dict = {
+            "Authorization": f"Bearer {self.sendgrid_api_key}",
+            "Content-Type": "application/json",
+        }
+        self._smtp_pool: queue.Queue = queue.Queue(maxsize=SMTP_POOL_SIZE)
+        # Provider is fixed for the process: prefer SendGrid, fall back to SMTP
+        if self.sendgrid_api_key:
+            self._dispatch = self._send_via_sendgrid
+        elif self.smtp_host and self.smtp_port and self.smtp_user:
+            self._dispatch = self._send_via_smtp
+        else:
+            self._dispatch = None
 
     def send_email(
         self,
@@ -49,17 +216,12 @@ class EmailService:
             logger.info("[EMAIL DISABLED] To: %s Subject: %s", to_email, subject)
             return True, "[DEV MODE] Email logged"
 
-        # Prefer SendGrid when api key is available
-        try:
-            if self.sendgrid_api_key:
-                return self._send_via_sendgrid(to_email, subject, html_content, text_content)
-
-            # Fallback to SMTP when configured
-            if self.smtp_host and self.smtp_port and self.smtp_user:
-                return self._send_via_smtp(to_email, subject, html_content, text_content)
-
+        if self._dispatch is None:
             logger.error("No email provider configured (SENDGRID_API_KEY or SMTP settings missing)")
             return False, "No email provider configured"
+
+        try:
+            return self._dispatch(to_email, subject, html_content, text_content)
         except Exception as exc:  # pragma: no cover - operational errors handled at runtime
             logger.exception("Error sending email: %s", exc)
             return False, str(exc)
@@ -68,49 +230,84 @@ class EmailService:
         """Send email over SMTP using smtplib."""
         msg = EmailMessage()
         msg["Subject"] = subject
-        msg["From"] = self.from_email
+        msg["From"] = self._from_header
         msg["To"] = to_email
         if text_content:
             msg.set_content(text_content)
         msg.add_alternative(html_content, subtype="html")
 
-        logger.debug("Connecting to SMTP host %s:%s", self.smtp_host, self.smtp_port)
-        with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=15) as smtp:
-            smtp.starttls()
-            smtp.login(self.smtp_user, self.smtp_password)
+        smtp = self._acquire_smtp()
+        try:
             smtp.send_message(msg)
+        except Exception:
+            self._close_smtp(smtp)
+            raise
+        self._release_smtp(smtp)
 
         logger.info("Email sent via SMTP to %s", to_email)
         return True, "sent-via-smtp"
 
+    def _connect_smtp(self) -> smtplib.SMTP:
+        logger.debug("Connecting to SMTP host %s:%s", self.smtp_host, self.smtp_port)
+        if self.smtp_implicit_tls:
+            smtp = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, timeout=15, context=_SMTP_SSL_CONTEXT)
+        else:
+            smtp = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=15)
+        try:
+            if not self.smtp_implicit_tls:
+                smtp.starttls()
+            smtp.login(self.smtp_user, self.smtp_password)
+        except Exception:
+            self._close_smtp(smtp)
+            raise
+        return smtp
+
+    def _acquire_smtp(self) -> smtplib.SMTP:
+        """Take a live pooled connection (checked with NOOP) or open a new one."""
+        while True:
+            try:
+                smtp = self._smtp_pool.get_nowait()
+            except queue.Empty:
+                return self._connect_smtp()
+            try:
+                if smtp.noop()[0] == 250:
+                    return smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            # Server dropped it (idle timeout etc.)
+            self._close_smtp(smtp)
+
+    def _release_smtp(self, smtp: smtplib.SMTP) -> None:
+        try:
+            self._smtp_pool.put_nowait(smtp)
+        except queue.Full:
+            self._close_smtp(smtp)
+
+    @staticmethod
+    def _close_smtp(smtp: smtplib.SMTP) -> None:
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
     def _send_via_sendgrid(self, to_email: str, subject: str, html_content: str, text_content: Optional[str]) -> Tuple[bool, str]:
         """Send email via SendGrid REST API using requests (no external lib required).
 
-        This uses the simple /mail/send endpoint. If `requests` is not installed
-        the function will raise ImportError which is handled by the caller.
+        This uses the simple /mail/send endpoint over the shared keep-alive session.
         """
-        try:
-            import requests
-        except Exception as exc:  # pragma: no cover - optional runtime dependency
-            logger.exception("requests library not available: %s", exc)
-            raise
-
+        if requests is None:
+            raise ImportError("requests library not available")
         url = "https://api.sendgrid.com/v3/mail/send"
-        payload = {
-            "personalizations": [{"to": [{"email": to_email}], "subject": subject}],
-            "from": {"email": self.from_email},
-            "content": []
-        }
+        content = [{"type": "text/html", "value": html_content}]
         if text_content:
-            payload["content"].append({"type": "text/plain", "value": text_content})
-        payload["content"].append({"type": "text/html", "value": html_content})
-
-        headers = {
-            "Authorization": f"Bearer {self.sendgrid_api_key}",
-            "Content-Type": "application/json"
-        }
+            content.insert(0, {"type": "text/plain", "value": text_content})
+        body = orjson.dumps({
+            "personalizations": [{"to": [{"email": to_email}], "subject": subject}],
+            "from": self._sendgrid_from,
+            "content": content,
+        })
 
-        resp = requests.post(url, headers=headers, data=json.dumps(payload), timeout=15)
+        resp = _SENDGRID_SESSION.post(url, headers=self._sendgrid_headers, data=body, timeout=15)
         if resp.status_code in (200, 202):
             logger.info("Email sent via SendGrid to %s (status=%s)", to_email, resp.status_code)
             return True, f"sendgrid:{resp.status_code}"
@@ -124,35 +321,9 @@ class EmailService:
 
         verify_section = ""
         if verification_url:
-            verify_section = f"""
-            <div style=\"background-color: #f0f8ff; padding: 20px; margin: 20px 0; border-radius: 5px;\">
-                <h2>Verify Your Email</h2>
-                <p>Please click the button below to verify your email address:</p>
-                <a href=\"{verification_url}\" style=\"display: inline-block; padding: 12px 24px; background-color: #007bff; color: white; text-decoration: none; border-radius: 5px; margin: 10px 0;\">Verify Email</a>
-                <p style=\"color: #666; font-size: 12px;\">Or copy and paste this link: {verification_url}</p>
-                <p style=\"color: #666; font-size: 12px;\">This link will expire in 24 hours.</p>
-            </div>
-            """
+            verify_section = _WELCOME_VERIFY_SECTION.format(verification_url=verification_url)
 
-        html_content = f"""
-        <html>
-            <body style=\"font-family: Arial, sans-serif; line-height: 1.6; color: #333;\">
-                <div style=\"max-width: 600px; margin: 0 auto; padding: 20px;\">
-                    <h1 style=\"color: #007bff;\">Welcome to CouponAli!</h1>
-                    <p>Thank you for joining us. Start saving on gift cards and earning cashback today!</p>
-                    {verify_section}
-                    <h3>What's Next?</h3>
-                    <ul>
-                        <li>Browse thousands of gift cards</li>
-                        <li>Earn cashback on every purchase</li>
-                        <li>Track your orders and wallet</li>
-                        <li>Refer friends and earn rewards</li>
-                    </ul>
-                    <p>Best regards,<br><strong>CouponAli Team</strong></p>
-                </div>
-            </body>
-        </html>
-        """
+        html_content = _WELCOME_TEMPLATE.format(verify_section=verify_section)
         return self.send_email(email, subject, html_content)
 
     def send_order_confirmation(
@@ -165,42 +336,21 @@ class EmailService:
         """Send order confirmation email."""
         subject = f"Order Confirmation - {order_number}"
 
-        items_html = ""
-        for item in items:
-            items_html += f"""
-            <tr>
-                <td>{item['product_name']}</td>
-                <td>{item['quantity']}</td>
-                <td>₹{item['unit_price']:.2f}</td>
-                <td>₹{item['subtotal']:.2f}</td>
-            </tr>
-            """
-
-        html_content = f"""
-        <html>
-            <body>
-                <h1>Order Confirmed!</h1>
-                <p>Your order <strong>{order_number}</strong> has been confirmed.</p>
-
-                <h2>Order Details</h2>
-                <table border=\"1\" cellpadding=\"10\">
-                    <tr>
-                        <th>Product</th>
-                        <th>Quantity</th>
-                        <th>Unit Price</th>
-                        <th>Subtotal</th>
-                    </tr>
-                    {items_html}
-                </table>
-
-                <h3>Total: ₹{total_amount:.2f}</h3>
-
-                <p>You will receive your voucher codes shortly.</p>
-
-                <p>Best regards,<br>CouponAli Team</p>
-            </body>
-        </html>
-        """
+        items_html = "".join(
+            _ORDER_ITEM_ROW_TEMPLATE.format(
+                product_name=_esc(str(item['product_name'])),
+                quantity=item['quantity'],
+                unit_price=item['unit_price'],
+                subtotal=item['subtotal'],
+            )
+            for item in items
+        )
+
+        html_content = _ORDER_TEMPLATE.format(
+            order_number=_esc(order_number),
+            items_html=items_html,
+            total_amount=total_amount,
+        )
         return self.send_email(email, subject, html_content)
 
     def send_voucher_email(
@@ -212,31 +362,17 @@ class EmailService:
         """Send email with voucher codes."""
         subject = f"Your Voucher Codes - {order_number}"
 
-        vouchers_html = ""
-        for voucher in vouchers:
-            vouchers_html += f"""
-            <div style=\"margin: 20px 0; padding: 15px; border: 2px solid #4CAF50; border-radius: 5px;\">
-                <h3>{voucher['product_name']}</h3>
-                <p><strong>Voucher Code:</strong> <span style=\"font-size: 20px; color: #4CAF50;\">{voucher['code']}</span></p>
-                <p><strong>Value:</strong> ₹{voucher['value']:.2f}</p>
-                {f"<p>{voucher.get('instructions', '')}</p>" if voucher.get('instructions') else ""}
-            </div>
-            """
-
-        html_content = f"""
-        <html>
-            <body>
-                <h1>Your Voucher Codes Are Ready!</h1>
-                <p>Order: <strong>{order_number}</strong></p>
-
-                {vouchers_html}
-
-                <p><strong>Important:</strong> Keep these codes safe and do not share them with anyone.</p>
-
-                <p>Best regards,<br>CouponAli Team</p>
-            </body>
-        </html>
-        """
+        vouchers_html = "".join(
+            _VOUCHER_ROW_TEMPLATE.format(
+                product_name=_esc(str(voucher['product_name'])),
+                code=_esc(str(voucher['code'])),
+                value=voucher['value'],
+                instructions_html=f"<p>{_esc(voucher['instructions'])}</p>" if voucher.get('instructions') else "",
+            )
+            for voucher in vouchers
+        )
+
+        html_content = _VOUCHER_TEMPLATE.format(order_number=_esc(order_number), vouchers_html=vouchers_html)
         return self.send_email(email, subject, html_content)
 
     def send_cashback_notification(
@@ -247,16 +383,7 @@ class EmailService:
     ) -> Tuple[bool, str]:
         """Send cashback credit notification."""
         subject = "Cashback Credited to Your Wallet!"
-        html_content = f"""
-        <html>
-            <body>
-                <h1>Cashback Credited!</h1>
-                <p>₹{amount:.2f} has been credited to your CouponAli wallet.</p>
-                <p>{description}</p>
-                <p>Best regards,<br>CouponAli Team</p>
-            </body>
-        </html>
-        """
+        html_content = _CASHBACK_TEMPLATE.format(amount=amount, description=_esc(description))
         return self.send_email(email, subject, html_content)
 
     def send_withdrawal_notification(
@@ -272,21 +399,13 @@ class EmailService:
         if status == "approved":
             message = f"Your withdrawal request of ₹{amount:.2f} has been approved and processed."
             if reference:
-                message += f" Reference: {reference}"
+                message += f" Reference: {_esc(reference)}"
         elif status == "rejected":
             message = f"Your withdrawal request of ₹{amount:.2f} has been rejected. Please contact support for details."
         else:
-            message = f"Your withdrawal request of ₹{amount:.2f} status: {status}"
+            message = f"Your withdrawal request of ₹{amount:.2f} status: {_esc(status)}"
 
-        html_content = f"""
-        <html>
-            <body>
-                <h1>Withdrawal Update</h1>
-                <p>{message}</p>
-                <p>Best regards,<br>CouponAli Team</p>
-            </body>
-        </html>
-        """
+        html_content = _WITHDRAWAL_TEMPLATE.format(message=message)
         return self.send_email(email, subject, html_content)
 
 
@@ -2,14 +2,20 @@
 Standardized error handling and exception classes for production API.
 """
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import Response
+from pydantic import BaseModel, computed_field
 from typing import Optional, Any
-from datetime import datetime
+from collections import defaultdict
+from functools import lru_cache
+from types import MappingProxyType
 import logging
 import traceback
 import uuid
 
+import orjson
+
+from .responses import request_timestamp
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,19 +26,25 @@ class ErrorResponse(BaseModel):
     code: str
     details: Optional[dict[str, Any]] = None
     request_id: Optional[str] = None
-    timestamp: str = None
     
-    def __init__(self, **data):
-        super().__init__(**data)
-        if not self.timestamp:
-            self.timestamp = datetime.utcnow().isoformat()
+    @computed_field
+    @property
+    def timestamp(self) -> str:
+        return request_timestamp()
 
 
 # ==================== Custom Exceptions ====================
 
+# Shared read-only details for exceptions raised without any
+_NO_DETAILS = MappingProxyType({})
+
+
 class APIException(Exception):
     """Base exception for API errors."""
     
+    # Keeps BaseException from materialising a per-instance __dict__
+    __slots__ = ("message", "code", "status_code", "details")
+    
     def __init__(
         self,
         message: str,
@@ -43,13 +55,15 @@ class APIException(Exception):
         self.message = message
         self.code = code
         self.status_code = status_code
-        self.details = details or {}
+        self.details = details or _NO_DETAILS
         super().__init__(self.message)
 
 
 class ValidationException(APIException):
     """Raised when input validation fails."""
     
+    __slots__ = ()
+    
     def __init__(self, message: str, details: Optional[dict] = None):
         super().__init__(
             message=message,
@@ -62,6 +76,8 @@ class ValidationException(APIException):
 class AuthenticationException(APIException):
     """Raised when authentication fails."""
     
+    __slots__ = ()
+    
     def __init__(self, message: str = "Authentication failed", details: Optional[dict] = None):
         super().__init__(
             message=message,
@@ -74,6 +90,8 @@ class AuthenticationException(APIException):
 class AuthorizationException(APIException):
     """Raised when authorization fails."""
     
+    __slots__ = ()
+    
     def __init__(self, message: str = "Insufficient permissions", details: Optional[dict] = None):
         super().__init__(
             message=message,
@@ -86,6 +104,8 @@ class AuthorizationException(APIException):
 class ResourceNotFoundException(APIException):
     """Raised when a resource is not found."""
     
+    __slots__ = ()
+    
     def __init__(self, resource_type: str, resource_id: Any = None):
         message = f"{resource_type} not found"
         if resource_id:
@@ -101,6 +121,8 @@ class ResourceNotFoundException(APIException):
 class ConflictException(APIException):
     """Raised when there's a resource conflict (e.g., duplicate)."""
     
+    __slots__ = ()
+    
     def __init__(self, message: str, details: Optional[dict] = None):
         super().__init__(
             message=message,
@@ -113,6 +135,8 @@ class ConflictException(APIException):
 class RateLimitException(APIException):
     """Raised when rate limit is exceeded."""
     
+    __slots__ = ()
+    
     def __init__(self, message: str = "Rate limit exceeded"):
         super().__init__(
             message=message,
@@ -125,6 +149,8 @@ class RateLimitException(APIException):
 class ExternalServiceException(APIException):
     """Raised when an external service call fails."""
     
+    __slots__ = ()
+    
     def __init__(self, service_name: str, message: str = None, details: Optional[dict] = None):
         msg = f"External service error: {service_name}"
         if message:
@@ -140,6 +166,8 @@ class ExternalServiceException(APIException):
 class DatabaseException(APIException):
     """Raised when database operations fail."""
     
+    __slots__ = ()
+    
     def __init__(self, message: str = "Database operation failed", details: Optional[dict] = None):
         super().__init__(
             message=message,
@@ -151,25 +179,34 @@ class DatabaseException(APIException):
 
 # ==================== Exception Handlers ====================
 
-async def api_exception_handler(request: Request, exc: APIException) -> JSONResponse:
+@lru_cache(maxsize=1)
+def _is_debug() -> bool:
+    """DEBUG flag, read from settings on the first unexpected error only."""
+    from .config_prod import get_settings
+    return get_settings().DEBUG
+
+
+# Production 500 body: only request_id and timestamp vary, so it is rendered
+# once and filled in per error (same shape as ErrorResponse)
+_INTERNAL_ERROR_TEMPLATE = (
+    b'{"success":false,"error":"An unexpected error occurred",'
+    b'"code":"INTERNAL_SERVER_ERROR","details":null,'
+    b'"request_id":__RID__,"timestamp":"__TS__"}'
+)
+
+
+async def api_exception_handler(request: Request, exc: APIException) -> Response:
     """Handle custom API exceptions."""
     request_id = getattr(request.state, "request_id", None) or str(uuid.uuid4())
     
-    # Log the error with appropriate level
-    if exc.status_code >= 500:
-        logger.error(
-            f"API Error [{exc.code}]: {exc.message}",
-            extra={
-                "request_id": request_id,
-                "path": request.url.path,
-                "method": request.method,
-                "status_code": exc.status_code,
-                "details": exc.details
-            }
-        )
-    else:
-        logger.warning(
-            f"API Error [{exc.code}]: {exc.message}",
+    # Log the error with appropriate level; skip building the record if filtered
+    level = logging.ERROR if exc.status_code >= 500 else logging.WARNING
+    if logger.isEnabledFor(level):
+        logger.log(
+            level,
+            "API Error [%s]: %s",
+            exc.code,
+            exc.message,
             extra={
                 "request_id": request_id,
                 "path": request.url.path,
@@ -186,52 +223,57 @@ async def api_exception_handler(request: Request, exc: APIException) -> JSONResp
         request_id=request_id
     )
     
-    return JSONResponse(
+    return Response(
+        content=response.model_dump_json(),
         status_code=exc.status_code,
-        content=response.dict()
+        media_type="application/json"
     )
 
 
-async def generic_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+async def generic_exception_handler(request: Request, exc: Exception) -> Response:
     """Handle unexpected exceptions."""
     request_id = getattr(request.state, "request_id", None) or str(uuid.uuid4())
     
     # Log full traceback for unexpected errors
-    logger.error(
-        f"Unexpected error: {str(exc)}",
-        exc_info=exc,
-        extra={
-            "request_id": request_id,
-            "path": request.url.path,
-            "method": request.method,
-            "error_type": type(exc).__name__
-        }
-    )
+    if logger.isEnabledFor(logging.ERROR):
+        logger.error(
+            "Unexpected error: %s",
+            exc,
+            exc_info=exc,
+            extra={
+                "request_id": request_id,
+                "path": request.url.path,
+                "method": request.method,
+                "error_type": type(exc).__name__
+            }
+        )
     
     # Don't expose internal details in production
-    from .config_prod import get_settings
-    settings = get_settings()
-    
-    if settings.DEBUG:
-        error_message = str(exc)
-        error_details = {
-            "type": type(exc).__name__,
-            "traceback": traceback.format_exc()
-        }
-    else:
-        error_message = "An unexpected error occurred"
-        error_details = None
+    if not _is_debug():
+        # request_id may come from a client header, so it is JSON-encoded
+        body = _INTERNAL_ERROR_TEMPLATE.replace(
+            b"__RID__", orjson.dumps(request_id)
+        ).replace(b"__TS__", request_timestamp().encode())
+        return Response(
+            content=body,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            media_type="application/json"
+        )
     
     response = ErrorResponse(
-        error=error_message,
+        error=str(exc),
         code="INTERNAL_SERVER_ERROR",
-        details=error_details,
+        details={
+            "type": type(exc).__name__,
+            "traceback": "".join(traceback.format_exception(exc))
+        },
         request_id=request_id
     )
     
-    return JSONResponse(
+    return Response(
+        content=response.model_dump_json(),
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content=response.dict()
+        media_type="application/json"
     )
 
 
@@ -239,13 +281,10 @@ async def generic_exception_handler(request: Request, exc: Exception) -> JSONRes
 
 def format_validation_errors(errors: list[dict]) -> dict:
     """Format Pydantic validation errors into a readable format."""
-    formatted = {}
+    formatted = defaultdict(list)
     for error in errors:
-        field = ".".join(str(x) for x in error["loc"][1:])
-        if field not in formatted:
-            formatted[field] = []
-        formatted[field].append(error["msg"])
-    return formatted
+        formatted[".".join(map(str, error["loc"][1:]))].append(error["msg"])
+    return dict(formatted)
 
 
 def raise_if_none(value: Any, message: str, resource_type: str = "Resource"):
@@ -0,0 +1,26 @@
+"""Shared outbound HTTP client.
+
+One pooled httpx.AsyncClient for calls to OAuth providers and other APIs, so
+TCP/TLS connections are kept alive across requests instead of being opened per
+call. Closed from the app shutdown hook; recreated on next use if needed.
+"""
+import httpx
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
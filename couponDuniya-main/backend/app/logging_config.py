@@ -1,4 +1,5 @@
-import json, logging, sys, time, uuid
+import json, logging, queue, sys, uuid
+from logging.handlers import QueueHandler, QueueListener
 from typing import Any, Dict
 
 REQUEST_ID_HEADER = "X-Request-ID"
@@ -9,7 +10,7 @@ class JsonFormatter(logging.Formatter):
             "level": record.levelname,
             "message": record.getMessage(),
             "logger": record.name,
-            "timestamp": int(time.time() * 1000),
+            "timestamp": int(record.created * 1000),
         }
         if hasattr(record, 'request_id'):
             base['request_id'] = getattr(record, 'request_id')
@@ -29,6 +30,48 @@ if not root.handlers:
 log = logging.getLogger("app")
 
 
+class _InProcessQueueHandler(QueueHandler):
+    """Enqueue records as-is; the listener thread does all formatting.
+
+    The stock prepare() formats the message and traceback on the caller's
+    thread so records can be pickled; ours never leave the process.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: QueueListener | None = None
+
+
+def start_queue_logging() -> None:
+    """Move root's handlers behind a queue so formatting and I/O happen off the request path."""
+    global _listener
+    if _listener is not None or not root.handlers:
+        return
+    handlers = root.handlers[:]
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(_InProcessQueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_queue_logging() -> None:
+    """Flush queued records and hand root its handlers back."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in root.handlers[:]:
+        if isinstance(handler, _InProcessQueueHandler):
+            root.removeHandler(handler)
+    for handler in _listener.handlers:
+        root.addHandler(handler)
+    _listener = None
+
+
 def with_request_id(logger: logging.Logger, request_id: str):
     class RequestAdapter(logging.LoggerAdapter):
         def process(self, msg, kwargs):
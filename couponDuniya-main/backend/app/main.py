@@ -14,10 +14,9 @@ import os
 
 # Import config with validation
 try:
-    from .config_prod import get_settings, validate_production_settings
+    from .config_prod import get_settings
 except ImportError:
     from .config import get_settings
-    validate_production_settings = lambda x: []
 
 from .api.v1 import (
     users, merchants, offers, products, orders, wallet, auth, admin, access,
@@ -30,21 +29,15 @@ from .api.v1 import (
 
 from .database import Base, engine
 from .errors import APIException, api_exception_handler, generic_exception_handler
+from .responses import ORJSONResponse, set_request_timestamp
 from .redis_client import rate_limit, redis_client
-from .logging_config import log, with_request_id
+from .logging_config import log, with_request_id, start_queue_logging, stop_queue_logging
 from .metrics import observe_request
+from .http_client import close_http_client
 
-# Initialize settings
+# Initialize settings (config_prod validates production settings on first load)
 settings = get_settings()
 
-# Validate production settings
-if settings.APP_ENV == 'production':
-    validation_errors = validate_production_settings(settings)
-    if validation_errors:
-        for error in validation_errors:
-            logging.error(f"Production configuration error: {error}")
-        raise RuntimeError("Production configuration validation failed")
-
 # Create FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
@@ -53,6 +46,7 @@ app = FastAPI(
     docs_url="/api/docs" if settings.DEBUG else None,
     redoc_url="/api/redoc" if settings.DEBUG else None,
     openapi_url="/api/openapi.json" if settings.DEBUG else None,
+    default_response_class=ORJSONResponse,
 )
 # Ensure tables exist in development (no-op if already migrated)
 try:
@@ -64,6 +58,30 @@ try:
 except Exception:
     pass
 
+
+# Sync route handlers (most of the API) run in AnyIO's threadpool
+@app.on_event("startup")
+async def configure_threadpool():
+    from anyio import to_thread
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+
+
+# Format and write log records on a background thread, not the request path
+@app.on_event("startup")
+async def start_log_listener():
+    start_queue_logging()
+
+
+@app.on_event("shutdown")
+async def stop_log_listener():
+    stop_queue_logging()
+
+
+# Close the shared outbound HTTP client (social login verification, OAuth callbacks)
+@app.on_event("shutdown")
+async def close_shared_http_client():
+    await close_http_client()
+
 # CORS - Allow all origins for Replit
 app.add_middleware(
     CORSMiddleware,
@@ -88,6 +106,7 @@ settings = get_settings()
 
 @app.middleware("http")
 async def rate_limit_middleware(request: Request, call_next):
+    set_request_timestamp()
     if request.url.path == "/health" or request.url.path.startswith("/docs"):
         return await call_next(request)
     client_ip = request.client.host if request.client else "unknown"
@@ -209,6 +228,7 @@ except Exception:
 
 # Sentry integration
 try:
+    # settings was rebound to app.config above, which keeps SENTRY_* flat
     if settings.SENTRY_DSN:
         import sentry_sdk
         from sentry_sdk.integrations.fastapi import FastApiIntegration
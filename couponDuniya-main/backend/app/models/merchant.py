@@ -1,10 +1,15 @@
-from sqlalchemy import String, Boolean, DateTime, Text
+from sqlalchemy import String, Boolean, DateTime, Text, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
 from ..database import Base
 
 class Merchant(Base):
     __tablename__ = "merchants"
+    __table_args__ = (
+        # Partial: listings only ever read active merchants
+        Index('idx_merchants_active_featured', 'is_featured',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active')),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(255), unique=True, index=True)
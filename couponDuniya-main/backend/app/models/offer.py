@@ -1,10 +1,15 @@
-from sqlalchemy import String, Boolean, DateTime, ForeignKey, Integer
+from sqlalchemy import String, Boolean, DateTime, ForeignKey, Integer, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from ..database import Base
 
 class Offer(Base):
     __tablename__ = "offers"
+    __table_args__ = (
+        # Backs the per-merchant active offer counts
+        Index('idx_offers_merchant_active', 'merchant_id',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active')),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     merchant_id: Mapped[int] = mapped_column(ForeignKey("merchants.id"), index=True)
@@ -1,28 +1,49 @@
 
-from sqlalchemy import ForeignKey, DateTime, String, Text, JSON
+from sqlalchemy import BigInteger, CheckConstraint, ForeignKey, DateTime, Integer, String, Text, JSON, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
-from datetime import datetime
+from datetime import datetime, timezone
+import os
 from ..database import Base
 
+# Same measurement toggle as payment_responses_001, so create_all() skips the
+# index too when it is set
+INDEX_ORDER_ID = os.getenv('SKIP_PAYMENT_RESPONSES_ORDER_ID_INDEX', '').lower() not in ('1', 'true', 'yes')
+
 class PaymentResponse(Base):
     __tablename__ = "payment_responses"
+    __table_args__ = (
+        CheckConstraint(
+            "payment_status IN ('initiated', 'authorized', 'captured', 'success', 'failed', 'refunded')",
+            name='ck_payment_responses_payment_status',
+        ),
+        Index('ix_payment_responses_payment_created', 'payment_id', 'created_at',
+              postgresql_include=['payment_status']),
+        Index('ix_payment_responses_razorpay_payment_id', 'razorpay_payment_id',
+              postgresql_where=text('razorpay_payment_id IS NOT NULL'),
+              sqlite_where=text('razorpay_payment_id IS NOT NULL')),
+        Index('ix_payment_responses_created_at_brin', 'created_at',
+              postgresql_using='brin', postgresql_with={'pages_per_range': 32}).ddl_if(dialect='postgresql'),
+    )
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    payment_id: Mapped[int] = mapped_column(ForeignKey("payments.id", ondelete="CASCADE"), index=True)
-    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id", ondelete="CASCADE"), index=True)
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    payment_id: Mapped[int] = mapped_column(ForeignKey("payments.id", ondelete="CASCADE"))
+    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id", ondelete="CASCADE"), index=INDEX_ORDER_ID)
     
     # Razorpay response details
-    razorpay_order_id: Mapped[str] = mapped_column(String(255), index=True)
-    razorpay_payment_id: Mapped[str | None] = mapped_column(String(255), index=True)
-    razorpay_signature: Mapped[str | None] = mapped_column(String(500))
+    razorpay_order_id: Mapped[str] = mapped_column(String(32), index=True)
+    razorpay_payment_id: Mapped[str | None] = mapped_column(String(32))
+    razorpay_signature: Mapped[str | None] = mapped_column(String(128))
     
     # Payment status and details
-    payment_status: Mapped[str] = mapped_column(String(50), default="initiated")  # initiated, success, failed
+    payment_status: Mapped[str] = mapped_column(String(50), default="initiated")  # initiated, authorized, captured, success, failed, refunded
     payment_method: Mapped[str | None] = mapped_column(String(50))  # card, upi, netbanking, wallet
     
     # Full response from Razorpay
-    razorpay_response: Mapped[dict | None] = mapped_column(JSON)
+    razorpay_response: Mapped[dict | None] = mapped_column(JSON().with_variant(JSONB, "postgresql"))
     error_description: Mapped[str | None] = mapped_column(Text)
     
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime | None] = mapped_column(DateTime, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=text('CURRENT_TIMESTAMP')
+    )
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), onupdate=lambda: datetime.now(timezone.utc))
@@ -12,6 +12,7 @@ class RefreshToken(Base):
         Index('idx_refresh_tokens_user_id', 'user_id'),
         Index('idx_refresh_tokens_token_hash', 'token_hash'),
         Index('idx_refresh_tokens_expires_at', 'expires_at'),
+        Index('idx_refresh_tokens_user_active', 'user_id', 'is_revoked'),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import String, Boolean, DateTime, Numeric, Enum as SQLEnum, Index
+from sqlalchemy import String, Boolean, DateTime, Numeric, Enum as SQLEnum, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 from uuid import uuid4
@@ -10,6 +10,12 @@ def generate_referral_code():
     return f"REF{str(uuid4())[:8].upper()}"
 
 
+def split_full_name(full_name: str | None) -> tuple[str, str]:
+    """Split a display name into (first_name, last_name) on the first space."""
+    parts = (full_name or "").split(" ", 1)
+    return parts[0][:100], (parts[1] if len(parts) > 1 else "")[:100]
+
+
 class UserStatus(str, enum.Enum):
     ACTIVE = "active"
     INACTIVE = "inactive"
@@ -36,13 +42,16 @@ class User(Base):
     __tablename__ = "users"
     
     __table_args__ = (
-        Index('idx_users_email_lower', 'email'),
+        # Expression index; login matches on lower(email)
+        Index('idx_users_email_lower', text('lower(email)')),
         Index('idx_users_mobile', 'mobile'),
         Index('idx_users_status', 'status'),
         Index('idx_users_role', 'role'),
         Index('idx_users_created_at', 'created_at'),
         Index('idx_users_referral_code', 'referral_code'),
     )
+    # Fetch server-generated values in the INSERT/UPDATE (RETURNING) instead of on next access
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     uuid: Mapped[str] = mapped_column(String(36), unique=True, index=True, default=lambda: str(uuid4()))
@@ -4,7 +4,8 @@ integration simple with existing sync endpoints while exposing core features.
 """
 import json
 import time
-from typing import Any, Callable
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator
 from .config import get_settings
 
 settings = get_settings()
@@ -18,12 +19,13 @@ class MockRedis:
     def incr(self, key, amount=1) -> int: return 1
     def expire(self, key, ttl) -> bool: return True
     def ttl(self, key) -> int: return -1
-    def pipeline(self): return MockPipeline()
+    def pipeline(self, transaction=True): return MockPipeline()
     def zincrby(self, key, amount, member) -> float: return float(amount)
     def zrevrange(self, key, start, end, withscores=False) -> list: return []
     def sadd(self, key, *members) -> int: return 0
-    def scan_iter(self, match=None): return iter([])
+    def scan_iter(self, match=None, count=None): return iter([])
     def lpush(self, key, *values) -> int: return 0
+    def rpush(self, key, *values) -> int: return 0
     def llen(self, key) -> int: return 0
     def publish(self, channel, message) -> int: return 0
     def info(self) -> dict: return {}
@@ -32,12 +34,24 @@ class MockRedis:
 class MockPipeline:
     def __init__(self):
         self._commands = []
+    def set(self, key, value, **kwargs):
+        self._commands.append(True)
+        return self
+    def setex(self, key, ttl, value):
+        self._commands.append(True)
+        return self
     def incr(self, key, amount=1):
         self._commands.append(1)
         return self
+    def expire(self, key, ttl):
+        self._commands.append(True)
+        return self
     def ttl(self, key):
         self._commands.append(-1)
         return self
+    def delete(self, *keys):
+        self._commands.append(0)
+        return self
     def execute(self):
         return self._commands if self._commands else [1, -1]
 
@@ -72,6 +86,18 @@ def cache_get(key: str) -> Any:
         return raw
 
 
+def cache_get_raw(key: str) -> str | None:
+    """Cached value exactly as stored (JSON text for dicts/lists), without decoding.
+
+    Lets handlers return a cache hit as a ready-made JSON response body.
+    """
+    try:
+        raw = redis_client.get(key)
+    except Exception:
+        return None
+    return None if raw is None else str(raw)
+
+
 def cache_set(key: str, value: Any, ttl: int) -> None:
     try:
         if isinstance(value, (dict, list)):
@@ -83,6 +109,20 @@ def cache_set(key: str, value: Any, ttl: int) -> None:
         return
 
 
+@contextmanager
+def redis_pipeline() -> Iterator[Any]:
+    """Queue several Redis writes and send them in one round-trip on exit.
+
+    Fails open like cache_set: if Redis errors, the queued commands are dropped.
+    """
+    pipe = redis_client.pipeline(transaction=False)
+    yield pipe
+    try:
+        pipe.execute()
+    except Exception:
+        return
+
+
 def cache_invalidate(key: str) -> None:
     try:
         redis_client.delete(key)
@@ -92,10 +132,28 @@ def cache_invalidate(key: str) -> None:
 
 def cache_invalidate_prefix(prefix: str) -> None:
     """Delete all keys matching a prefix; use sparingly to clear listing caches."""
+    cache_invalidate_many(prefixes=[prefix])
+
+
+INVALIDATE_CHUNK_SIZE = 500
+
+
+def cache_invalidate_many(keys: Iterable[str] = (), prefixes: Iterable[str] = ()) -> None:
+    """Delete explicit keys plus everything under the given prefixes.
+
+    Matching keys are collected with SCAN and all DELs go out in one pipeline,
+    in chunks of INVALIDATE_CHUNK_SIZE keys per command.
+    """
     try:
-        keys = list(redis_client.scan_iter(match=f"{prefix}*"))
-        if keys:
-            redis_client.delete(*keys)
+        targets = list(keys)
+        for prefix in prefixes:
+            targets.extend(redis_client.scan_iter(match=f"{prefix}*", count=INVALIDATE_CHUNK_SIZE))
+        if not targets:
+            return
+        pipe = redis_client.pipeline(transaction=False)
+        for i in range(0, len(targets), INVALIDATE_CHUNK_SIZE):
+            pipe.delete(*targets[i:i + INVALIDATE_CHUNK_SIZE])
+        pipe.execute()
     except Exception:
         return
 
@@ -105,12 +163,15 @@ def rate_limit(identifier: str, limit: int, window_seconds: int) -> tuple[bool,
     """Increment counter for identifier; return (allowed, remaining, ttl)."""
     key = rk("rate_limit", identifier)
     try:
+        # One MULTI/EXEC round-trip: SET NX EX opens the window (with its TTL)
+        # only when the key is new, then INCR and TTL read it back
         pipe = redis_client.pipeline()
+        pipe.set(key, 0, ex=window_seconds, nx=True)
         pipe.incr(key, 1)
         pipe.ttl(key)
-        results = pipe.execute()
-        count, ttl = results
+        _, count, ttl = pipe.execute()
         if ttl == -1:
+            # Counter left without a TTL (e.g. created before this scheme)
             redis_client.expire(key, window_seconds)
             ttl = window_seconds
         allowed = count <= limit
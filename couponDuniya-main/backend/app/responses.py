@@ -3,10 +3,46 @@ Standardized API response wrappers for consistent response formatting.
 """
 from typing import TypeVar, Generic, Optional, Any, List
 from pydantic import BaseModel, Field
+from fastapi.responses import JSONResponse
+from contextvars import ContextVar
 from datetime import datetime
+from decimal import Decimal
+import orjson
 
 T = TypeVar('T')
 
+# ISO timestamp of the request being handled, set once by the HTTP middleware
+_request_timestamp: ContextVar[Optional[str]] = ContextVar("request_timestamp", default=None)
+
+
+def set_request_timestamp() -> str:
+    """Stamp the current request with the time; call once per request."""
+    ts = datetime.utcnow().isoformat()
+    _request_timestamp.set(ts)
+    return ts
+
+
+def request_timestamp() -> str:
+    """ISO timestamp of the current request, or now when outside a request."""
+    return _request_timestamp.get() or datetime.utcnow().isoformat()
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Encode the types orjson has no native support for (UUID/datetime are native)."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson straight to bytes."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
 
 class PaginationMetadata(BaseModel):
     """Pagination metadata."""
@@ -35,7 +71,7 @@ class SuccessResponse(BaseModel, Generic[T]):
     success: bool = True
     message: str = Field(default="Request successful", description="Human-readable message")
     data: Optional[T] = Field(default=None, description="Response data")
-    timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    timestamp: str = Field(default_factory=request_timestamp)
     request_id: Optional[str] = Field(default=None, description="Request ID for tracing")
 
 
@@ -45,7 +81,7 @@ class PaginatedResponse(BaseModel, Generic[T]):
     message: str = Field(default="Request successful")
     data: List[T] = Field(default_factory=list, description="List of items")
     pagination: PaginationMetadata
-    timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    timestamp: str = Field(default_factory=request_timestamp)
     request_id: Optional[str] = Field(default=None)
 
 
@@ -55,7 +91,7 @@ class ListResponse(BaseModel, Generic[T]):
     message: str = Field(default="Request successful")
     data: List[T] = Field(default_factory=list)
     count: int = Field(default=0, description="Total count of items")
-    timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
+    timestamp: str = Field(default_factory=request_timestamp)
     request_id: Optional[str] = Field(default=None)
 
 
@@ -63,7 +99,7 @@ def success_response(
     data: Optional[Any] = None,
     message: str = "Success",
     request_id: Optional[str] = None
-) -> dict:
+) -> ORJSONResponse:
     """Create a standardized success response.
     
     Args:
@@ -72,15 +108,15 @@ def success_response(
         request_id: Request ID for tracing
         
     Returns:
-        Dictionary with standardized structure
+        ORJSONResponse with standardized structure
     """
-    return {
+    return ORJSONResponse({
         "success": True,
         "message": message,
         "data": data,
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": request_timestamp(),
         "request_id": request_id
-    }
+    })
 
 
 def paginated_response(
@@ -90,7 +126,7 @@ def paginated_response(
     total: int,
     message: str = "Success",
     request_id: Optional[str] = None
-) -> dict:
+) -> ORJSONResponse:
     """Create a standardized paginated response.
     
     Args:
@@ -102,11 +138,11 @@ def paginated_response(
         request_id: Request ID for tracing
         
     Returns:
-        Dictionary with pagination metadata
+        ORJSONResponse with pagination metadata
     """
     total_pages = (total + limit - 1) // limit if limit > 0 else 0
     
-    return {
+    return ORJSONResponse({
         "success": True,
         "message": message,
         "data": data,
@@ -118,16 +154,16 @@ def paginated_response(
             "has_next": page < total_pages,
             "has_prev": page > 1
         },
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": request_timestamp(),
         "request_id": request_id
-    }
+    })
 
 
 def list_response(
     data: List[Any],
     message: str = "Success",
     request_id: Optional[str] = None
-) -> dict:
+) -> ORJSONResponse:
     """Create a standardized list response (non-paginated).
     
     Args:
@@ -136,13 +172,13 @@ def list_response(
         request_id: Request ID for tracing
         
     Returns:
-        Dictionary with list and count
+        ORJSONResponse with list and count
     """
-    return {
+    return ORJSONResponse({
         "success": True,
         "message": message,
         "data": data,
         "count": len(data),
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": request_timestamp(),
         "request_id": request_id
-    }
+    })
@@ -93,9 +93,9 @@ class CheckoutResponse(BaseModel):
 class PaymentVerificationRequest(BaseModel):
     """Razorpay payment verification."""
     order_id: int
-    razorpay_order_id: str
-    razorpay_payment_id: str
-    razorpay_signature: str
+    razorpay_order_id: str = Field(max_length=32)
+    razorpay_payment_id: str = Field(max_length=32)
+    razorpay_signature: str = Field(max_length=128)
 
 
 class PaymentVerificationResponse(BaseModel):
@@ -1,7 +1,9 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from jose import jwt
 from uuid import uuid4
+import time
 from fastapi import HTTPException
 from .config import get_settings
 from .redis_client import redis_client, rk
@@ -22,17 +24,26 @@ def create_access_token(subject: str) -> str:
     to_encode = {"sub": subject, "exp": expire, "jti": jti}
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
+@lru_cache(maxsize=4096)
+def _verified_claims(token: str) -> dict:
+    """Signature-checked claims, memoised per process; failures are not cached."""
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+
 def decode_token(token: str) -> dict:
     """Decode a JWT token and return its payload or raise HTTPException."""
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        payload = _verified_claims(token)
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
-    # Blacklist check
+    # A memoised payload can outlive its token, so expiry is re-checked here
+    exp = payload.get("exp")
+    if exp is not None and exp <= time.time():
+        raise HTTPException(status_code=401, detail="Invalid token")
+    # Blacklist check (never cached, so revocation takes effect immediately)
     jti = payload.get("jti")
     if jti and is_token_revoked(jti):
         raise HTTPException(status_code=401, detail="Token revoked")
-    return payload
+    return dict(payload)
 
 def revoke_token(token: str) -> None:
     """Add token jti to blacklist set if present."""
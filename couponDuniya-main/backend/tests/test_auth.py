@@ -1,6 +1,8 @@
 """Tests for authentication API endpoints."""
 import pytest
-from fastapi import status
+from fastapi import HTTPException, status
+
+from app.dependencies import bearer_token
 
 
 class TestRegistration:
@@ -62,6 +64,27 @@ class TestRegistration:
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert "already exists" in response.json()["detail"].lower()
 
+    def test_register_duplicate_email_different_case(self, client, db_session):
+        """Emails differing only in case belong to the same account."""
+        client.post(
+            "/api/v1/auth/register",
+            json={
+                "email": "CaseUser@example.com",
+                "password": "SecurePass123!",
+            },
+        )
+
+        response = client.post(
+            "/api/v1/auth/register",
+            json={
+                "email": "caseuser@example.com",
+                "password": "AnotherPass123!",
+            },
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "already exists" in response.json()["detail"].lower()
+
     def test_register_with_referral(self, client, db_session):
         """Test registration with referral code."""
         # Create referrer
@@ -220,3 +243,19 @@ class TestOTP:
 
         # Check if rate limited (implementation dependent)
         # assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+class TestBearerToken:
+    """Test Authorization header parsing."""
+
+    @pytest.mark.parametrize("header", ["Bearer abc.def", "bearer abc.def", "BEARER abc.def"])
+    def test_scheme_is_case_insensitive(self, header):
+        """Test the Bearer scheme is matched in any case."""
+        assert bearer_token(header) == "abc.def"
+
+    @pytest.mark.parametrize("header", [None, "", "Bearer", "Bearer ", "Basic abc.def"])
+    def test_missing_or_wrong_scheme(self, header):
+        """Test headers without a bearer token are rejected."""
+        with pytest.raises(HTTPException) as exc_info:
+            bearer_token(header)
+        assert exc_info.value.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,68 @@
+"""Tests for production settings loading and validation."""
+from app.config_prod import (
+    IntegrationSettings,
+    Settings,
+    build_settings_fast,
+    production_readiness_errors,
+    validate_production_settings,
+)
+
+STRONG_SECRET = "x" * 32
+
+
+def test_build_settings_fast_production_dry_run():
+    """Documented dry run: dump validated settings, override, validate."""
+    data = Settings().model_dump()
+    data.update(
+        APP_ENV="production",
+        DEBUG=False,
+        SECRET_KEY=STRONG_SECRET,
+        JWT_SECRET_KEY=STRONG_SECRET,
+        INTERNAL_API_KEY=STRONG_SECRET,
+    )
+    data["integrations"].update(RAZORPAY_KEY_ID="rzp_live_key", RAZORPAY_KEY_SECRET="secret")
+
+    dry_run = build_settings_fast(data)
+
+    assert isinstance(dry_run.integrations, IntegrationSettings)
+    assert validate_production_settings(dry_run) == []
+
+
+def test_build_settings_fast_production_dry_run_reports_missing_credentials():
+    data = Settings().model_dump()
+    data.update(APP_ENV="production", DEBUG=True)
+    data["integrations"].update(RAZORPAY_KEY_ID="", RAZORPAY_KEY_SECRET="")
+
+    errors = validate_production_settings(build_settings_fast(data))
+
+    assert "DEBUG must be False in production" in errors
+    assert "Razorpay credentials required for payment processing" in errors
+
+
+def test_production_readiness_errors_checks_staging_as_production():
+    staging = Settings(APP_ENV="staging", DEBUG=True, SECRET_KEY="short")
+
+    errors = production_readiness_errors(staging)
+
+    assert "DEBUG must be False in production" in errors
+    assert "SECRET_KEY must be at least 32 characters" in errors
+    # The dry run leaves the loaded settings untouched
+    assert staging.APP_ENV == "staging"
+
+
+def test_csv_env_values_are_split_and_stripped(monkeypatch):
+    monkeypatch.setenv("CORS_ORIGINS", "https://a.example, https://b.example,")
+
+    assert Settings().CORS_ORIGINS == ["https://a.example", "https://b.example"]
+
+
+def test_empty_admin_ip_whitelist_is_an_empty_list(monkeypatch):
+    monkeypatch.setenv("ADMIN_IP_WHITELIST", "")
+
+    assert Settings().ADMIN_IP_WHITELIST == []
+
+
+def test_unknown_env_keys_are_ignored(monkeypatch):
+    monkeypatch.setenv("SOME_UNKNOWN_KEY", "value")
+
+    assert not hasattr(Settings(), "SOME_UNKNOWN_KEY")
@@ -0,0 +1,72 @@
+"""Tests for the user profile API."""
+from fastapi import status
+from sqlalchemy import exists, false
+from fastapi.testclient import TestClient
+from app.api.v1 import users as users_api
+from app.dependencies import get_current_user
+from tests.factories import create_user
+
+
+def _login_as(client: TestClient, user):
+    client.app.dependency_overrides[get_current_user] = lambda: user
+
+
+def test_update_profile_rejects_mobile_in_use(client: TestClient, db_session):
+    owner = create_user(db_session, "mobileowner@example.com")
+    owner.mobile = "+919800000001"
+    db_session.commit()
+    user = create_user(db_session, "mobileclaimer@example.com")
+    _login_as(client, user)
+
+    resp = client.put("/api/v1/users/profile", json={"mobile": "+919800000001"})
+
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert resp.json()["detail"] == "Mobile number already in use"
+    db_session.refresh(user)
+    assert user.mobile is None
+    client.app.dependency_overrides.clear()
+
+
+def test_update_profile_mobile_race_returns_400(client: TestClient, db_session, monkeypatch):
+    """A concurrent claim that slips past the guard hits the unique constraint."""
+    owner = create_user(db_session, "raceowner@example.com")
+    owner.mobile = "+919800000003"
+    db_session.commit()
+    user = create_user(db_session, "raceclaimer@example.com")
+    _login_as(client, user)
+    # Guard sees no other owner, as it would if the owner committed after it ran
+    monkeypatch.setattr(users_api, "exists", lambda: exists().where(false()))
+
+    resp = client.put("/api/v1/users/profile", json={"mobile": "+919800000003"})
+
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert resp.json()["detail"] == "Mobile number already in use"
+    client.app.dependency_overrides.clear()
+
+
+def test_update_profile_sets_free_mobile(client: TestClient, db_session):
+    user = create_user(db_session, "mobilefree@example.com")
+    _login_as(client, user)
+
+    resp = client.put("/api/v1/users/profile", json={"mobile": "+919800000002"})
+
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.json()["data"]["mobile"] == "+919800000002"
+    db_session.refresh(user)
+    assert user.mobile == "+919800000002"
+    client.app.dependency_overrides.clear()
+
+
+def test_update_profile_name_only(client: TestClient, db_session):
+    user = create_user(db_session, "nameonly@example.com")
+    _login_as(client, user)
+
+    resp = client.put("/api/v1/users/profile", json={"full_name": "Asha Rao"})
+
+    assert resp.status_code == status.HTTP_200_OK
+    data = resp.json()["data"]
+    assert data["full_name"] == "Asha Rao"
+    assert data["first_name"] == "Asha"
+    assert data["last_name"] == "Rao"
+    assert data["mobile"] is None
+    client.app.dependency_overrides.clear()